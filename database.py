@@ -4,23 +4,37 @@ Database module for Image Converter application.
 Handles PostgreSQL connection, schema creation, and image metadata operations.
 """
 
+import csv
 import hashlib
+import io
 import logging
+import math
+import mmap
 import os
+import sys
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 from contextlib import contextmanager
 
 from dotenv import load_dotenv
 from sqlalchemy import (
-    create_engine, Column, Integer, String, DateTime, BigInteger,
-    Boolean, Text, Index, UniqueConstraint
+    create_engine, event, insert, select, inspect, text, func, any_, bindparam, Column, Integer,
+    String, DateTime, BigInteger, LargeBinary, Index, UniqueConstraint
 )
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+
+try:
+    import blake3  # Optional: SIMD tree hash, much faster than SHA-256 for dedup
+except ImportError:
+    blake3 = None
 
 # Load environment variables
 load_dotenv()
@@ -31,46 +45,196 @@ logger = logging.getLogger(__name__)
 # Database configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'postgresql://localhost:5432/defaultdb')
 
+# Hash algorithm used for duplicate detection (stored in file_records.hash_type).
+# When HASH_TYPE is unset an existing database keeps the algorithm its records
+# were hashed with; only a new or empty one gets DEFAULT_HASH_TYPE (SHA-256 when
+# the blake3 package is missing).
+HASH_TYPE = (os.getenv('HASH_TYPE') or '').lower() or None
+DEFAULT_HASH_TYPE = 'blake3' if blake3 is not None else 'sha256'
+SUPPORTED_HASH_TYPES = ('sha256', 'blake3')
+
+# Hashing thresholds
+MMAP_THRESHOLD = 256 * 1024               # 256KB: map instead of streaming
+BLAKE3_THREADED_THRESHOLD = 1024 * 1024   # 1MB: let BLAKE3 hash one file on several cores
+HASH_CHUNK_SIZE = 1024 * 1024             # 1MB minimum read size when streaming
+
+# Maximum number of hash -> original_name lookups kept in memory (~20MB)
+DUPLICATE_CACHE_SIZE = 100_000
+
+# Rows per multi-row INSERT statement
+BULK_INSERT_SIZE = 1000
+
+# Bloom filter over stored hashes: false-positive rate and rows fetched per round trip
+HASH_FILTER_ERROR_RATE = 0.001
+HASH_FILTER_FETCH_SIZE = 10_000
+# Above this many rows the filter is not built (streaming every hash costs more
+# than the duplicate lookups it would save); callers query the database instead
+HASH_FILTER_MAX_ROWS = 1_000_000
+
+# Columns loaded by the COPY-based bulk import path
+# (processed_at is filled in by the server default)
+COPY_COLUMNS = (
+    'hash', 'original_name', 'file_size', 'extension', 'created_at',
+    'source_path', 'target_path', 'hash_type'
+)
+
+# hashlib.file_digest runs the read/update loop in C (Python 3.11+)
+HAS_FILE_DIGEST = sys.version_info >= (3, 11)
+
+# posix_fadvise is only available on POSIX systems (not Windows/macOS)
+HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+def _advise_sequential(fd: int) -> None:
+    """Hint the kernel that a file will be read once, front to back."""
+    if HAS_FADVISE:
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
 # SQLAlchemy setup
 Base = declarative_base()
 
+class HexDigest(TypeDecorator):
+    """
+    Stores a hex digest as raw bytes (BYTEA on PostgreSQL).
+    
+    The binary form is half the size of the hex string, which halves the
+    unique index and the bytes compared per lookup. Application code keeps
+    working with hex strings; conversion happens at the bind/result boundary.
+    """
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        return bytes.fromhex(value)
+    
+    def process_result_value(self, value, dialect):
+        return bytes(value).hex() if value is not None else None
+
 class FileRecord(Base):
     """SQLAlchemy model for file records storage."""
     __tablename__ = 'file_records'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    hash = Column(String(128), nullable=False, unique=True)
-    original_name = Column(String(500), nullable=False)
+    hash = Column(HexDigest(32), nullable=False)
+    original_name = Column(String(255), nullable=False)
     file_size = Column(BigInteger, nullable=False)
     extension = Column(String(50), nullable=False)
     created_at = Column(DateTime, nullable=False)
-    processed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    source_path = Column(Text, nullable=False)
-    target_path = Column(Text, nullable=True)
+    processed_at = Column(DateTime, server_default=func.now(), nullable=False)
+    source_path = Column(String(4096), nullable=False)
+    target_path = Column(String(4096), nullable=True)
     hash_type = Column(String(20), nullable=False, default='sha256')
     
-    # Indexes for performance
+    # Indexes for performance; uq_file_hash already provides the hash lookup index
     __table_args__ = (
-        Index('idx_file_records_hash', 'hash'),
         Index('idx_file_records_extension', 'extension'),
         Index('idx_file_records_processed_at', 'processed_at'),
-        Index('idx_file_records_file_size', 'file_size'),
+        Index('idx_fr_size_hash', 'file_size', 'hash'),
         UniqueConstraint('hash', name='uq_file_hash'),
     )
     
     def __repr__(self):
         return f"<FileRecord(original_name='{self.original_name}', hash='{self.hash[:8]}...')>"
 
+class HashBloomFilter:
+    """
+    Bloom filter over hex digests, used to skip duplicate queries.
+    
+    A miss proves the hash is not in the database; a hit may be a false
+    positive and must still be confirmed with a query. The digests are
+    already uniformly distributed, so bit positions are derived from two
+    64-bit slices of the digest (double hashing) instead of rehashing.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = HASH_FILTER_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self._num_bits = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self._num_hashes = max(round(self._num_bits / capacity * math.log(2)), 1)
+        self._bits = bytearray((self._num_bits + 7) // 8)
+    
+    def _positions(self, file_hash: str):
+        h1 = int(file_hash[:16], 16)
+        h2 = int(file_hash[16:32], 16) | 1
+        num_bits = self._num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self._num_hashes)]
+    
+    def add(self, file_hash: str) -> None:
+        bits = self._bits
+        for pos in self._positions(file_hash):
+            bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, file_hash: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(file_hash))
+
 class DatabaseManager:
     """Manages database connections and operations with connection pooling."""
     
-    def __init__(self, database_url: str = DATABASE_URL):
-        """Initialize database manager with connection pooling."""
+    def __init__(self, database_url: str = DATABASE_URL, hash_type: Optional[str] = HASH_TYPE):
+        """Initialize database manager with connection pooling.
+        
+        hash_type=None means "not configured": the algorithm is taken from the
+        stored records once create_tables() has run.
+        """
         self.database_url = database_url
+        self.configured_hash_type = hash_type
+        self.hash_type = self._resolve_hash_type(hash_type or DEFAULT_HASH_TYPE)
+        # Threads BLAKE3 may use for one large file (AUTO = one per core);
+        # lowered by set_hash_concurrency when several files hash in parallel
+        self.hash_max_threads = blake3.blake3.AUTO if blake3 is not None else 1
         self.engine = None
         self.SessionLocal = None
+        
+        # LRU cache of recent duplicate lookups: hash -> original_name (or None)
+        self._dup_cache: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._dup_cache_lock = threading.Lock()
+        
         self._initialize_engine()
     
+    @staticmethod
+    def _resolve_hash_type(hash_type: str) -> str:
+        """Validate the configured hash algorithm, falling back to SHA-256."""
+        if hash_type not in SUPPORTED_HASH_TYPES:
+            logger.warning(f"Unsupported hash type '{hash_type}', using sha256")
+            return 'sha256'
+        if hash_type == 'blake3' and blake3 is None:
+            logger.warning("blake3 package is not installed, using sha256")
+            return 'sha256'
+        return hash_type
+    
+    def _new_hasher(self, file_size: int = 0):
+        """Create a fresh hash object for the configured algorithm.
+        
+        BLAKE3 hashes of files of at least BLAKE3_THREADED_THRESHOLD bytes are
+        split across up to hash_max_threads cores (the tree structure allows it);
+        smaller inputs stay single-threaded where the thread hand-off would cost
+        more than it saves.
+        """
+        if self.hash_type == 'blake3':
+            if file_size >= BLAKE3_THREADED_THRESHOLD and self.hash_max_threads != 1:
+                return blake3.blake3(max_threads=self.hash_max_threads)
+            return blake3.blake3()
+        return hashlib.sha256()
+    
+    def set_hash_concurrency(self, workers: int) -> None:
+        """
+        根据并行哈希的工作线程数限制 BLAKE3 单文件的线程数。
+        
+        每个工作线程最多使用 CPU 核数 / workers 个哈希线程，
+        避免 workers × 哈希线程数超过核数造成过度订阅。
+        
+        Args:
+            workers (int): 同时计算哈希的工作线程数
+        """
+        if blake3 is None:
+            return
+        self.hash_max_threads = max(1, (os.cpu_count() or 1) // max(workers, 1))
+        logger.debug(f"BLAKE3 max threads per file: {self.hash_max_threads} ({workers} workers)")
+    
     def _initialize_engine(self):
         """Initialize SQLAlchemy engine with connection pooling."""
         try:
@@ -81,8 +245,11 @@ class DatabaseManager:
                 max_overflow=20,
                 pool_pre_ping=True,
                 pool_recycle=3600,
-                echo=False  # Set to True for SQL debugging
+                echo=False,  # Set to True for SQL debugging
+                **self._driver_engine_options()
             )
+            if self.engine.dialect.name == 'sqlite':
+                event.listen(self.engine, 'connect', self._set_sqlite_pragmas)
             self.SessionLocal = sessionmaker(
                 autocommit=False,
                 autoflush=False,
@@ -93,15 +260,191 @@ class DatabaseManager:
             logger.error(f"Failed to initialize database engine: {e}")
             raise
     
+    def _driver_engine_options(self) -> Dict[str, Any]:
+        """
+        Return driver-specific engine options for fast multi-row execution.
+        
+        psycopg2 gets its fast execution helpers enabled so executemany-style
+        INSERT/UPDATE batches are sent in pages instead of one round-trip per
+        row. Other drivers (including psycopg 3) keep SQLAlchemy's defaults,
+        which already batch INSERTs via "insertmanyvalues".
+        """
+        url = make_url(self.database_url)
+        if url.get_backend_name() == 'postgresql' and url.get_driver_name() == 'psycopg2':
+            return {
+                'executemany_mode': 'values_plus_batch',
+                'insertmanyvalues_page_size': BULK_INSERT_SIZE,
+                'executemany_batch_page_size': 500,
+            }
+        return {}
+    
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Enable WAL journaling with synchronous=NORMAL on each SQLite connection.
+        
+        Readers no longer block the writer, and a commit appends to the WAL
+        instead of fsyncing the database file, so batched commits stay cheap.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        finally:
+            cursor.close()
+    
     def create_tables(self):
         """Create all database tables if they don't exist."""
         try:
             Base.metadata.create_all(bind=self.engine)
+            self._migrate_schema()
+            self._check_hash_type()
             logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Failed to create database tables: {e}")
             raise
     
+    def _check_hash_type(self):
+        """Match hash_type to the algorithm of the records already stored.
+        
+        Hashes of different algorithms never compare equal, so running with a
+        different algorithm than the table silently disables duplicate
+        detection for every existing file; refuse to start instead.
+        
+        Raises:
+            RuntimeError: HASH_TYPE differs from the stored records' algorithm.
+        """
+        # Oldest and newest record by primary key: two index lookups instead of
+        # a DISTINCT scan, and enough to see an earlier algorithm switch
+        with self.engine.connect() as conn:
+            oldest, newest = (
+                conn.execute(text(f"SELECT hash_type FROM file_records ORDER BY id {order} LIMIT 1")).scalar()
+                for order in ('ASC', 'DESC')
+            )
+        if newest is None:
+            return
+        
+        if self.configured_hash_type is None:
+            if newest == 'blake3' and blake3 is None:
+                raise RuntimeError("file_records was hashed with blake3, but the blake3 package is not installed")
+            self.hash_type = newest
+        elif self.hash_type not in (oldest, newest):
+            raise RuntimeError(
+                f"HASH_TYPE is {self.hash_type} but file_records was hashed with {newest}; "
+                f"set HASH_TYPE={newest} or unset it"
+            )
+        logger.info(f"Using {self.hash_type} hashes (matches existing records)")
+    
+    def _migrate_schema(self):
+        """Bring tables created by older versions up to the current schema."""
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            columns = {col['name']: col for col in inspect(self.engine).get_columns('file_records')}
+            if columns['processed_at']['default'] is None:
+                self._rebuild_sqlite_table(columns)
+            self._migrate_sqlite_hashes()
+        elif dialect == 'postgresql':
+            columns = {col['name']: col for col in inspect(self.engine).get_columns('file_records')}
+            if not isinstance(columns['hash']['type'], LargeBinary):
+                # Hex string -> raw digest; dependent indexes are rebuilt by ALTER
+                with self.engine.begin() as conn:
+                    conn.execute(text(
+                        "ALTER TABLE file_records ALTER COLUMN hash TYPE bytea USING decode(hash, 'hex')"
+                    ))
+                logger.info("Migrated file_records.hash to bytea")
+            
+            if columns['processed_at']['default'] is None:
+                # processed_at is now assigned by the server instead of each client row
+                with self.engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE file_records ALTER COLUMN processed_at SET DEFAULT now()"))
+        
+        self._migrate_indexes()
+    
+    def _migrate_indexes(self):
+        """Replace the hash/size indexes of older versions with idx_fr_size_hash.
+        
+        create_all() does not touch an existing table, so the new indexes are
+        created here before the redundant ones are dropped. Only missing or
+        obsolete indexes cause DDL; an up-to-date table is just inspected.
+        SQLite cannot drop the unnamed column-level UNIQUE of old tables
+        without rebuilding the table, so that one is kept.
+        """
+        inspector = inspect(self.engine)
+        index_names = {ix['name'] for ix in inspector.get_indexes('file_records')}
+        unique_names = {uc['name'] for uc in inspector.get_unique_constraints('file_records')}
+        
+        statements = []
+        if 'uq_file_hash' not in index_names | unique_names:
+            statements.append("CREATE UNIQUE INDEX uq_file_hash ON file_records (hash)")
+        if 'idx_fr_size_hash' not in index_names:
+            statements.append("CREATE INDEX idx_fr_size_hash ON file_records (file_size, hash)")
+        # Indexes made redundant by uq_file_hash and idx_fr_size_hash
+        for name in ('idx_file_records_hash', 'idx_file_records_file_size'):
+            if name in index_names:
+                statements.append(f"DROP INDEX {name}")
+        if 'file_records_hash_key' in unique_names:  # PostgreSQL column-level unique=True
+            statements.append("ALTER TABLE file_records DROP CONSTRAINT file_records_hash_key")
+        if not statements:
+            return
+        
+        with self.engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+        logger.info(f"Migrated file_records indexes ({len(statements)} changes)")
+    
+    def _rebuild_sqlite_table(self, columns: Dict[str, Dict[str, Any]]):
+        """Recreate an old SQLite file_records table with the current schema.
+        
+        SQLite cannot ALTER a column default, and inserts no longer supply
+        processed_at, so old tables (processed_at NOT NULL without a default)
+        are copied into a freshly created table. Hashes keep their hex text
+        until _migrate_sqlite_hashes converts them.
+        """
+        table = FileRecord.__table__
+        copied = ', '.join(col.name for col in table.columns if col.name in columns)
+        old_indexes = [ix['name'] for ix in inspect(self.engine).get_indexes('file_records') if ix['name']]
+        with self.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE file_records RENAME TO file_records_old"))
+            # Index names are per schema, not per table; free them for the new table
+            for name in old_indexes:
+                conn.execute(text(f"DROP INDEX {name}"))
+            table.create(conn)
+            conn.execute(text(f"INSERT INTO file_records ({copied}) SELECT {copied} FROM file_records_old"))
+            conn.execute(text("DROP TABLE file_records_old"))
+        logger.info("Rebuilt file_records with the current schema (processed_at default)")
+    
+    def _migrate_sqlite_hashes(self):
+        """Convert hex TEXT hashes left by older versions to raw digest BLOBs.
+        
+        SQLite keeps each value's own storage class, so old rows stay hex text
+        and never equal the bytes bound by HexDigest. Converted in Python in
+        id-ordered chunks (unhex() needs SQLite 3.41+). A legacy row whose
+        digest was stored again after the upgrade is a duplicate of that
+        newer row and is removed.
+        """
+        select_legacy = text(
+            "SELECT id, hash FROM file_records WHERE typeof(hash) = 'text' AND id > :last_id "
+            "ORDER BY id LIMIT :limit"
+        )
+        converted = removed = 0
+        last_id = 0
+        while True:
+            with self.engine.begin() as conn:
+                rows = conn.execute(select_legacy, {'last_id': last_id, 'limit': BULK_INSERT_SIZE}).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                params = [{'id': row_id, 'digest': bytes.fromhex(value)} for row_id, value in rows]
+                converted += conn.execute(
+                    text("UPDATE OR IGNORE file_records SET hash = :digest WHERE id = :id"), params
+                ).rowcount
+                removed += conn.execute(
+                    text("DELETE FROM file_records WHERE id = :id AND typeof(hash) = 'text'"), params
+                ).rowcount
+        if converted or removed:
+            logger.info(f"Migrated {converted} file_records.hash values to binary "
+                        f"({removed} duplicate legacy rows removed)")
+    
     @contextmanager
     def get_session(self):
         """Context manager for database sessions."""
@@ -116,38 +459,144 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def calculate_file_hash(self, file_path: Path, chunk_size: int = 65536) -> str:
+    @contextmanager
+    def batch_session(self):
+        """
+        批量处理使用的长生命周期会话。
+        
+        在多次批量查重 / 插入之间复用同一个会话，调用方每写完一批记录后
+        自行调用 session.commit()，退出上下文时提交剩余事务；出错时回滚。
+        传给 check_duplicates_bulk、add_file_records_bulk 和
+        bulk_copy_file_records 的 session 参数时，这些方法不会单独提交。
+        
+        Yields:
+            Session: 数据库会话
+        """
+        with self.get_session() as session:
+            yield session
+    
+    @contextmanager
+    def _session_scope(self, session: Optional[Session] = None):
+        """Reuse the caller's session if given, otherwise open a committing one."""
+        if session is not None:
+            yield session
+        else:
+            with self.get_session() as new_session:
+                yield new_session
+    
+    def calculate_file_hash(self, file_path: Path, chunk_size: Optional[int] = None,
+                            file_size: Optional[int] = None) -> str:
         """
-        计算文件的 SHA-256 哈希值（优化版本）。
+        计算文件的哈希值（优化版本）。
         
-        使用更大的缓冲区提高 I/O 性能，并添加文件大小检查优化。
+        使用 hash_type 指定的算法（默认 BLAKE3，可选 SHA-256）。
+        大文件使用 mmap 映射后整体交给哈希对象，避免 Python 层的分块循环和
+        额外的用户态缓冲区拷贝；其余文件（以及 mmap 失败时）使用
+        hashlib.file_digest 在 C 层完成读取与哈希。
         
         Args:
             file_path (Path): 文件路径
-            chunk_size (int): 读取缓冲区大小，默认 64KB
+            chunk_size (Optional[int]): Python 3.11 以下回退分块读取时的缓冲区大小，
+                默认取 1MB 与文件系统块大小 16 倍中的较大值
+            file_size (Optional[int]): 调用方已知的文件大小（如扫描时的 stat 结果），
+                提供时不再 stat 文件
             
         Returns:
-            str: 文件的 SHA-256 哈希值
+            str: 文件哈希值的十六进制字符串
             
         Raises:
             Exception: 文件读取失败时抛出异常
         """
-        hash_sha256 = hashlib.sha256()
         try:
-            # 获取文件大小用于优化小文件处理
-            file_size = file_path.stat().st_size
+            if file_size is None:
+                file_size = os.stat(file_path).st_size
+            if file_size >= MMAP_THRESHOLD:
+                try:
+                    return self._hash_mmap(file_path, file_size)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"mmap 失败，回退到流式读取 {file_path}: {e}")
             
-            # 对于小文件（<1MB），一次性读取
-            if file_size < 1024 * 1024:
-                with open(file_path, 'rb') as f:
-                    hash_sha256.update(f.read())
-            else:
-                # 对于大文件，使用优化的块大小分块读取
-                with open(file_path, 'rb') as f:
-                    while chunk := f.read(chunk_size):
-                        hash_sha256.update(chunk)
-                        
-            return hash_sha256.hexdigest()
+            with open(file_path, 'rb', buffering=0) as f:
+                # 无缓冲的原始文件对象：每次读取直接对应一次 read 系统调用
+                _advise_sequential(f.fileno())
+                if HAS_FILE_DIGEST:
+                    return hashlib.file_digest(f, self._new_hasher).hexdigest()
+                
+                if chunk_size is None:
+                    blksize = getattr(os.fstat(f.fileno()), 'st_blksize', 0)
+                    chunk_size = max(HASH_CHUNK_SIZE, blksize * 16)
+                
+                hasher = self._new_hasher()
+                while chunk := f.read(chunk_size):
+                    hasher.update(chunk)
+                return hasher.hexdigest()
+        except Exception as e:
+            logger.error(f"计算文件哈希失败 {file_path}: {e}")
+            raise
+    
+    def _hash_mmap(self, file_path: Path, file_size: int) -> str:
+        """Hash a file by mapping it read-only into memory."""
+        hasher = self._new_hasher(file_size)
+        if self.hash_type == 'blake3':
+            # 映射与（多线程）哈希都在扩展内完成，全程释放 GIL
+            hasher.update_mmap(os.fspath(file_path))
+            return hasher.hexdigest()
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                # 提示内核顺序预读（哈希只从头到尾读一遍）
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                hasher.update(memoryview(mm))
+        finally:
+            os.close(fd)
+        return hasher.hexdigest()
+    
+    def hash_file_with_header(self, file_path: Path, file_size: Optional[int] = None,
+                              header_size: int = 16) -> Tuple[str, bytes]:
+        """
+        计算文件哈希，并在同一次读取中取出文件开头的字节。
+        
+        文件头可直接用于魔数校验，调用方无需为验证再次打开文件。
+        大文件同样使用 mmap，小文件按块读取（256KB 以下一次读完）。
+        
+        Args:
+            file_path (Path): 文件路径
+            file_size (Optional[int]): 调用方已知的文件大小，提供时不再 stat 文件
+            header_size (int): 返回的文件头字节数，默认为 16
+            
+        Returns:
+            Tuple[str, bytes]: (文件哈希值的十六进制字符串, 文件头字节)
+            
+        Raises:
+            Exception: 文件读取失败时抛出异常
+        """
+        try:
+            if file_size is None:
+                file_size = os.stat(file_path).st_size
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                if file_size >= MMAP_THRESHOLD:
+                    try:
+                        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                                mm.madvise(mmap.MADV_SEQUENTIAL)
+                            hasher = self._new_hasher(file_size)
+                            hasher.update(memoryview(mm))
+                            return hasher.hexdigest(), mm[:header_size]
+                    except (OSError, ValueError) as e:
+                        logger.debug(f"mmap 失败，回退到流式读取 {file_path}: {e}")
+                
+                _advise_sequential(fd)
+                hasher = self._new_hasher(file_size)
+                header = b''
+                while chunk := os.read(fd, HASH_CHUNK_SIZE):
+                    if len(header) < header_size:
+                        header += chunk[:header_size - len(header)]
+                    hasher.update(chunk)
+                return hasher.hexdigest(), header
+            finally:
+                os.close(fd)
         except Exception as e:
             logger.error(f"计算文件哈希失败 {file_path}: {e}")
             raise
@@ -167,16 +616,141 @@ class DatabaseManager:
         Raises:
             Exception: 数据库查询失败时抛出异常
         """
+        with self._dup_cache_lock:
+            if file_hash in self._dup_cache:
+                self._dup_cache.move_to_end(file_hash)
+                return self._dup_cache[file_hash]
+        
         try:
             with self.get_session() as session:
                 # 只查询需要的字段，提高查询性能
                 result = session.query(FileRecord.original_name).filter(
                     FileRecord.hash == file_hash
                 ).first()
-                return result[0] if result else None
+                existing_name = result[0] if result else None
         except Exception as e:
             logger.error(f"检查重复文件失败，哈希: {file_hash[:8]}..., 错误: {e}")
             raise
+        
+        self._cache_duplicate(file_hash, existing_name)
+        return existing_name
+    
+    def check_duplicates_bulk(self, file_hashes: List[str],
+                              session: Optional[Session] = None) -> Dict[str, str]:
+        """
+        批量检查重复文件。
+        
+        一次查询检查多个哈希值，代替逐个调用 check_duplicate 产生的多次往返。
+        PostgreSQL 上使用 hash = ANY(:hashes) 数组绑定，其他数据库使用 IN。
+        查询结果（包括未命中）同样写入重复检查缓存。
+        
+        Args:
+            file_hashes (List[str]): 文件哈希值列表
+            session (Optional[Session]): 复用的批量会话，默认单独开启会话
+            
+        Returns:
+            Dict[str, str]: 已存在的哈希值到原始文件名的映射
+            
+        Raises:
+            Exception: 数据库查询失败时抛出异常
+        """
+        duplicates: Dict[str, str] = {}
+        missing: List[str] = []
+        with self._dup_cache_lock:
+            for file_hash in dict.fromkeys(file_hashes):
+                if file_hash in self._dup_cache:
+                    self._dup_cache.move_to_end(file_hash)
+                    if self._dup_cache[file_hash] is not None:
+                        duplicates[file_hash] = self._dup_cache[file_hash]
+                else:
+                    missing.append(file_hash)
+        
+        if not missing:
+            return duplicates
+        
+        if self.engine.dialect.name == 'postgresql':
+            condition = FileRecord.hash == any_(
+                bindparam('hashes', missing, type_=postgresql.ARRAY(HexDigest))
+            )
+        else:
+            condition = FileRecord.hash.in_(missing)
+        
+        try:
+            with self._session_scope(session) as session:
+                rows = session.execute(
+                    select(FileRecord.hash, FileRecord.original_name).where(condition)
+                ).all()
+        except Exception as e:
+            logger.error(f"批量检查重复文件失败 ({len(missing)} 个哈希): {e}")
+            raise
+        
+        found = {file_hash: original_name for file_hash, original_name in rows}
+        duplicates.update(found)
+        for file_hash in missing:
+            self._cache_duplicate(file_hash, found.get(file_hash))
+        return duplicates
+    
+    def get_known_sizes(self) -> Set[int]:
+        """
+        一次查询加载所有已记录的文件大小。
+        
+        Returns:
+            Set[int]: 数据库中出现过的文件大小集合
+        """
+        try:
+            with self.get_session() as session:
+                return set(session.execute(select(FileRecord.file_size).distinct()).scalars())
+        except Exception as e:
+            logger.error(f"加载已知文件大小失败: {e}")
+            raise
+    
+    def build_hash_filter(self, headroom: int = 2,
+                          max_rows: int = HASH_FILTER_MAX_ROWS) -> Optional[HashBloomFilter]:
+        """
+        流式读取所有已记录的哈希，构建 Bloom 过滤器。
+        
+        过滤器容量按当前记录数的 headroom 倍预留，为本次扫描新写入的哈希留出空间；
+        未命中的哈希一定不存在于数据库中，无需查询。
+        记录数超过 max_rows 时不读取哈希，直接返回 None。
+        
+        Args:
+            headroom (int): 容量相对当前记录数的倍数，默认为 2
+            max_rows (int): 构建过滤器的最大记录数，默认为 HASH_FILTER_MAX_ROWS
+            
+        Returns:
+            Optional[HashBloomFilter]: 包含所有已记录哈希的过滤器；
+                记录数超过 max_rows 时返回 None，调用方应直接查询数据库
+        """
+        try:
+            with self.get_session() as session:
+                count = session.execute(select(func.count(FileRecord.id))).scalar_one()
+                if count > max_rows:
+                    logger.info(f"记录数 {count} 超过 {max_rows}，不构建哈希过滤器")
+                    return None
+                hash_filter = HashBloomFilter(max(count * headroom, 65536))
+                result = session.execute(
+                    select(FileRecord.hash).execution_options(yield_per=HASH_FILTER_FETCH_SIZE)
+                )
+                for file_hash in result.scalars():
+                    hash_filter.add(file_hash)
+                return hash_filter
+        except Exception as e:
+            logger.error(f"加载哈希过滤器失败: {e}")
+            raise
+    
+    def _cache_duplicate(self, file_hash: str, original_name: Optional[str]) -> None:
+        """Remember a lookup result, evicting the least recently used entry."""
+        with self._dup_cache_lock:
+            self._dup_cache[file_hash] = original_name
+            self._dup_cache.move_to_end(file_hash)
+            if len(self._dup_cache) > DUPLICATE_CACHE_SIZE:
+                self._dup_cache.popitem(last=False)
+    
+    def _invalidate_duplicates(self, file_hashes) -> None:
+        """Drop cached lookups so the next check goes back to the database."""
+        with self._dup_cache_lock:
+            for file_hash in file_hashes:
+                self._dup_cache.pop(file_hash, None)
     
     def add_file_record(self, 
                        original_name: str,
@@ -186,42 +760,295 @@ class DatabaseManager:
                        extension: str,
                        created_at: datetime,
                        target_path: str = None,
-                       hash_type: str = 'sha256') -> int:
-        """Add new file record to database."""
+                       hash_type: str = None) -> Optional[int]:
+        """
+        Add new file record to database.
+        
+        使用 INSERT ... ON CONFLICT (hash) DO NOTHING RETURNING id，
+        哈希已存在时不抛出 IntegrityError，而是返回 None。
+        
+        Returns:
+            Optional[int]: 新记录 ID；哈希已存在时返回 None
+        """
+        record_id, _ = self.add_file_record_or_get_duplicate(
+            original_name=original_name,
+            source_path=source_path,
+            file_size=file_size,
+            file_hash=file_hash,
+            extension=extension,
+            created_at=created_at,
+            target_path=target_path,
+            hash_type=hash_type
+        )
+        return record_id
+    
+    def add_file_record_or_get_duplicate(self,
+                                         original_name: str,
+                                         source_path: str,
+                                         file_size: int,
+                                         file_hash: str,
+                                         extension: str,
+                                         created_at: datetime,
+                                         target_path: str = None,
+                                         hash_type: str = None) -> Tuple[Optional[int], Optional[str]]:
+        """
+        插入文件记录，若哈希已存在则返回已有文件名。
+        
+        新文件只需一条 INSERT ... ON CONFLICT DO NOTHING RETURNING id 语句，
+        合并了原先的重复检查与插入两次往返；仅在冲突时于同一事务内
+        再查询已有记录的原始文件名。
+        
+        Args:
+            与 add_file_record 相同
+            
+        Returns:
+            Tuple[Optional[int], Optional[str]]: (新记录 ID, None) 或
+                (None, 已存在文件的原始文件名)
+            
+        Raises:
+            Exception: 数据库写入失败时抛出异常
+        """
+        with self._dup_cache_lock:
+            cached_name = self._dup_cache.get(file_hash)
+        if cached_name is not None:
+            return None, cached_name
+        
+        stmt = self._insert_ignoring_duplicates().values(
+            hash=file_hash,
+            original_name=original_name,
+            source_path=source_path,
+            file_size=file_size,
+            extension=extension,
+            created_at=created_at,
+            target_path=target_path,
+            hash_type=hash_type or self.hash_type
+        ).returning(FileRecord.__table__.c.id)
+        
         try:
             with self.get_session() as session:
-                record = FileRecord(
-                    hash=file_hash,
-                    original_name=original_name,
-                    source_path=source_path,
-                    file_size=file_size,
-                    extension=extension,
-                    created_at=created_at,
-                    target_path=target_path,
-                    hash_type=hash_type
-                )
-                session.add(record)
-                session.flush()  # Get the ID without committing
-                record_id = record.id
-                logger.info(f"Added file record for {original_name}")
-                return record_id
-        except IntegrityError as e:
-            logger.warning(f"Duplicate hash detected for {original_name}: {e}")
-            raise
+                record_id = session.execute(stmt).scalar()
+                existing_name = None
+                if record_id is None:
+                    existing_name = session.execute(
+                        select(FileRecord.original_name).where(FileRecord.hash == file_hash)
+                    ).scalar()
         except Exception as e:
             logger.error(f"Failed to add file record for {original_name}: {e}")
             raise
+        
+        if record_id is None:
+            logger.warning(f"Duplicate hash detected for {original_name}: {existing_name}")
+            self._cache_duplicate(file_hash, existing_name)
+        else:
+            logger.info(f"Added file record for {original_name}")
+            self._cache_duplicate(file_hash, original_name)
+        return record_id, existing_name
     
-
+    def add_file_records_or_get_duplicates(self, records: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        在一个事务中批量插入文件记录，并返回每条记录对应的已有文件名。
+        
+        新记录通过多行 INSERT ... ON CONFLICT (hash) DO NOTHING RETURNING hash 写入，
+        未插入的哈希在同一事务内用一次批量查询取回已有文件名；批次内哈希相同的
+        记录以首次出现的一条为准。整个批次只提交一次事务。
+        
+        Args:
+            records (List[Dict[str, Any]]): 文件记录字典列表，键与
+                add_file_records_bulk 相同
+            
+        Returns:
+            List[Optional[str]]: 与 records 一一对应；新插入的记录为 None，
+                重复记录为已存在文件的原始文件名
+            
+        Raises:
+            Exception: 数据库写入失败时抛出异常
+        """
+        if not records:
+            return []
+        
+        stmt = self._insert_ignoring_duplicates().returning(FileRecord.__table__.c.hash)
+        inserted: Set[str] = set()
+        try:
+            with self.get_session() as session:
+                for start in range(0, len(records), BULK_INSERT_SIZE):
+                    chunk = [
+                        {'hash_type': self.hash_type, **record}
+                        for record in records[start:start + BULK_INSERT_SIZE]
+                    ]
+                    inserted.update(session.execute(stmt, chunk).scalars())
+                
+                conflicts = [record['hash'] for record in records if record['hash'] not in inserted]
+                existing: Dict[str, str] = {}
+                if conflicts:
+                    # 冲突说明记录已存在，缓存中的“未命中”结果已过期
+                    self._invalidate_duplicates(conflicts)
+                    existing = self.check_duplicates_bulk(conflicts, session=session)
+        except Exception as e:
+            logger.error(f"批量写入文件记录失败 ({len(records)} 条): {e}")
+            raise
+        
+        results: List[Optional[str]] = []
+        claimed: Dict[str, str] = {}
+        for record in records:
+            file_hash = record['hash']
+            if file_hash in inserted and file_hash not in claimed:
+                claimed[file_hash] = record['original_name']
+                self._cache_duplicate(file_hash, record['original_name'])
+                results.append(None)
+            else:
+                results.append(claimed.get(file_hash) or existing.get(file_hash))
+        logger.info(f"批量写入文件记录: {len(claimed)}/{len(records)}")
+        return results
+    
+    def _insert_ignoring_duplicates(self):
+        """Build an INSERT for file_records that skips rows whose hash already exists."""
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            stmt = postgresql.insert(FileRecord.__table__)
+        elif dialect == 'sqlite':
+            stmt = sqlite.insert(FileRecord.__table__)
+        else:
+            return insert(FileRecord.__table__)
+        return stmt.on_conflict_do_nothing(index_elements=['hash'])
+    
+    def add_file_records_bulk(self, records: List[Dict[str, Any]],
+                              session: Optional[Session] = None) -> int:
+        """
+        批量插入文件记录。
+        
+        每 BULK_INSERT_SIZE 行合并为一条多行 INSERT 语句执行，哈希冲突的行
+        通过 ON CONFLICT (hash) DO NOTHING 跳过，不会中断整个批次。
+        
+        Args:
+            records (List[Dict[str, Any]]): 文件记录字典列表，键与
+                add_file_record 的参数一致（hash 列使用 'hash' 键）
+            session (Optional[Session]): 复用的批量会话，由调用方提交
+            
+        Returns:
+            int: 实际插入的记录数量
+            
+        Raises:
+            Exception: 数据库写入失败时抛出异常
+        """
+        if not records:
+            return 0
+        
+        stmt = self._insert_ignoring_duplicates().returning(FileRecord.__table__.c.id)
+        inserted = 0
+        try:
+            with self._session_scope(session) as session:
+                for start in range(0, len(records), BULK_INSERT_SIZE):
+                    chunk = [
+                        {'hash_type': self.hash_type, **record}
+                        for record in records[start:start + BULK_INSERT_SIZE]
+                    ]
+                    inserted += len(session.execute(stmt, chunk).all())
+            self._invalidate_duplicates(record['hash'] for record in records)
+            logger.info(f"批量插入文件记录: {inserted}/{len(records)}")
+            return inserted
+        except Exception as e:
+            logger.error(f"批量插入文件记录失败 ({len(records)} 条): {e}")
+            raise
+    
+    def bulk_copy_file_records(self, records: List[Dict[str, Any]],
+                               session: Optional[Session] = None) -> int:
+        """
+        使用 PostgreSQL COPY 批量导入文件记录。
+        
+        记录先写入内存 CSV 缓冲区，通过 COPY FROM STDIN 载入临时表，再以
+        INSERT ... SELECT ... ON CONFLICT (hash) DO NOTHING 合并到 file_records，
+        保持哈希唯一性语义。非 psycopg2 驱动时回退到 add_file_records_bulk。
+        
+        Args:
+            records (List[Dict[str, Any]]): 文件记录字典列表，键与
+                add_file_records_bulk 相同
+            session (Optional[Session]): 复用的批量会话，由调用方提交
+            
+        Returns:
+            int: 实际插入的记录数量
+            
+        Raises:
+            Exception: 数据库写入失败时抛出异常
+        """
+        if not records:
+            return 0
+        if self.engine.dialect.driver != 'psycopg2':
+            return self.add_file_records_bulk(records, session=session)
+        
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for record in records:
+            writer.writerow((
+                '\\x' + record['hash'],  # bytea hex input format
+                record['original_name'],
+                record['file_size'],
+                record['extension'],
+                record['created_at'],
+                record['source_path'],
+                record.get('target_path'),
+                record.get('hash_type') or self.hash_type,
+            ))
+        buf.seek(0)
+        
+        if session is not None:
+            # 在调用方的事务内执行，由 batch_session 负责提交或回滚
+            try:
+                with session.connection().connection.cursor() as cur:
+                    inserted = self._copy_into_file_records(cur, buf)
+            except Exception as e:
+                logger.error(f"COPY 导入文件记录失败 ({len(records)} 条): {e}")
+                raise
+            self._invalidate_duplicates(record['hash'] for record in records)
+            logger.info(f"COPY 导入文件记录: {inserted}/{len(records)}")
+            return inserted
+        
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cur:
+                inserted = self._copy_into_file_records(cur, buf)
+            conn.commit()
+            self._invalidate_duplicates(record['hash'] for record in records)
+            logger.info(f"COPY 导入文件记录: {inserted}/{len(records)}")
+            return inserted
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"COPY 导入文件记录失败 ({len(records)} 条): {e}")
+            raise
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _copy_into_file_records(cur, buf: io.StringIO) -> int:
+        """COPY a CSV buffer into a staging table and merge it, skipping known hashes."""
+        columns = ', '.join(COPY_COLUMNS)
+        cur.execute(
+            f"CREATE TEMP TABLE file_records_staging ON COMMIT DROP AS "
+            f"SELECT {columns} FROM file_records WITH NO DATA"
+        )
+        cur.copy_expert(
+            f"COPY file_records_staging ({columns}) FROM STDIN WITH CSV", buf
+        )
+        cur.execute(
+            f"INSERT INTO file_records ({columns}) "
+            f"SELECT {columns} FROM file_records_staging "
+            f"ON CONFLICT (hash) DO NOTHING"
+        )
+        inserted = cur.rowcount
+        # 同一事务内可能多次 COPY，不能等到提交时才删除临时表
+        cur.execute("DROP TABLE file_records_staging")
+        return inserted
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics."""
         try:
             with self.get_session() as session:
-                total_files = session.query(FileRecord).count()
-                processed_files = session.query(FileRecord).filter(
-                    FileRecord.processed_at.isnot(None)
-                ).count()
+                # One scan instead of a separate COUNT(*) per figure
+                total_files, processed_files = session.execute(
+                    select(
+                        func.count(),
+                        func.count().filter(FileRecord.processed_at.isnot(None))
+                    ).select_from(FileRecord)
+                ).one()
                 
                 return {
                     'total_files': total_files,
@@ -238,13 +1065,39 @@ class DatabaseManager:
             self.engine.dispose()
             logger.info("Database connections closed")
 
-# Global database manager instance
-db_manager = DatabaseManager()
+# Global database manager instance, created on first use
+_db_manager: Optional[DatabaseManager] = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """
+    获取全局 DatabaseManager 实例（延迟初始化）。
+    
+    导入模块时不再创建引擎和连接池，首次调用时才读取 DATABASE_URL /
+    HASH_TYPE 环境变量并建立连接，调用方可以先加载自己的配置。
+    
+    Returns:
+        DatabaseManager: 全局数据库管理器实例
+    """
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager(
+                    database_url=os.getenv('DATABASE_URL', DATABASE_URL),
+                    hash_type=(os.getenv('HASH_TYPE') or '').lower() or None
+                )
+    return _db_manager
+
+def close_database():
+    """Close the global database manager if it was ever created."""
+    if _db_manager is not None:
+        _db_manager.close()
 
 def initialize_database():
     """Initialize database and create tables."""
     try:
-        db_manager.create_tables()
+        get_db_manager().create_tables()
         logger.info("Database initialized successfully")
         return True
     except Exception as e:
@@ -257,7 +1110,7 @@ if __name__ == "__main__":
     coloredlogs.install(level='INFO')
     
     if initialize_database():
-        stats = db_manager.get_statistics()
+        stats = get_db_manager().get_statistics()
         print(f"Database statistics: {stats}")
     else:
         print("Failed to initialize database")
\ No newline at end of file
@@ -1,50 +1,157 @@
 #!/usr/bin/env python3
 """
 File scanning module for Image Converter application.
-Scans specified folders for image files at regular intervals.
+Scans specified folders for image files at regular intervals, or reacts to
+file system events when the optional watchdog backend is enabled.
 """
 
 import logging
 import time
 from pathlib import Path
-from typing import Set, Callable, Optional, Dict, Any, List
-from threading import Thread, Event
-from queue import Queue
+from typing import Set, Callable, Optional, Dict, Any, Iterator, Tuple
+from threading import Thread, Event, Lock, Semaphore
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
+import sys
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of queued files taken per wakeup of the process worker
+DRAIN_BATCH_SIZE = 128
+
+# Seconds a file reported by watchdog must go without events, with size and
+# mtime unchanged between two checks, before it is queued (files that report
+# a close-after-write are queued immediately)
+EVENT_SETTLE_TIME = 1.0
+
+# Directory names never descended into during recursive scans
+DEFAULT_EXCLUDED_DIR_NAMES = frozenset({'.git', '__pycache__', 'node_modules', '.cache', '.venv'})
+
+class _ScanEventHandler(FileSystemEventHandler):
+    """Forwards watchdog events to the owning FileScanner.
+    
+    Creation and writes only mark a file as changing (a file moved in from
+    outside the watched tree is also reported as created). It is queued once
+    it is closed after writing (inotify) or has settled for EVENT_SETTLE_TIME.
+    A file renamed within the tree is complete and is queued right away.
+    """
+    
+    def __init__(self, scanner: 'FileScanner'):
+        super().__init__()
+        self.scanner = scanner
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self.scanner._note_event_path(event.src_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.scanner._note_event_path(event.src_path)
+    
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.scanner._enqueue_event_path(event.dest_path)
+    
+    def on_closed(self, event):
+        if not event.is_directory:
+            self.scanner._enqueue_event_path(event.src_path)
+
 class FileScanner:
     """Scans directories for image files at regular intervals."""
     
     def __init__(self, 
                  supported_extensions: Set[str],
-                 file_processor_callback: Callable[[Path], None],
-                 scan_interval: int = 5):
+                 file_processor_callback: Callable[[Path, Optional[os.stat_result]], None],
+                 scan_interval: int = 5,
+                 max_workers: Optional[int] = None,
+                 use_watchdog: bool = False,
+                 excluded_dir_names: Optional[Set[str]] = None,
+                 skip_hidden_dirs: bool = True):
         """Initialize file scanner.
         
         Args:
             supported_extensions: Set of supported file extensions
-            file_processor_callback: Callback function to process detected files
+            file_processor_callback: Callback function to process detected files,
+                called with the file path and the stat result gathered while scanning.
+                It runs concurrently on a worker pool and must be thread-safe.
             scan_interval: Scan interval in seconds
+            max_workers: Number of worker threads running the callback
+                (defaults to the CPU count)
+            use_watchdog: React to file system events (inotify / FSEvents /
+                ReadDirectoryChangesW) instead of re-scanning every interval.
+                Requires the watchdog package; falls back to polling without it.
+            excluded_dir_names: Directory names skipped during recursive scans
+                (defaults to DEFAULT_EXCLUDED_DIR_NAMES)
+            skip_hidden_dirs: Also skip directories whose name starts with '.'
         """
-        self.supported_extensions = {ext.lower() for ext in supported_extensions}
+        # Immutable, interned extension set: lookups hash the suffix once and
+        # usually hit the identity fast path when comparing
+        self.supported_extensions = frozenset(sys.intern(ext.lower()) for ext in supported_extensions)
+        # Suffix matching: lower only the last few characters of a name and let
+        # str.endswith walk the extension tuple in C (no slicing at '.', no hashing)
+        self._ext_tuple = tuple(sorted(self.supported_extensions))
+        self._max_ext_len = max(map(len, self._ext_tuple), default=0)
         self.file_processor_callback = file_processor_callback
         self.scan_interval = scan_interval
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.excluded_dir_names = frozenset(
+            DEFAULT_EXCLUDED_DIR_NAMES if excluded_dir_names is None else excluded_dir_names
+        )
+        self.skip_hidden_dirs = skip_hidden_dirs
         
-        # Threading components
-        self.file_queue = Queue()
+        # Threading components: single producer / single consumer, so a deque's
+        # atomic append/popleft is enough and the Event only signals new items
+        self.file_queue = deque()
+        self._has_items = Event()
         self.stop_event = Event()
         self.scan_thread = None
         self.process_thread = None
         
-        # Scan paths
-        self.scan_paths = set()
+        # Worker pool for the callback; the semaphore bounds files in flight
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._in_flight = Semaphore(self.max_workers * 2)
+        
+        # Scan paths: an immutable snapshot replaced under a lock on every change,
+        # so the scan thread can iterate it without copying or locking
+        self._scan_paths_snapshot: Tuple[Tuple[str, bool], ...] = ()
+        self._scan_paths_lock = Lock()
+        
+        # Files already queued: (st_dev, st_ino) -> (st_mtime_ns, st_size).
+        # Entries are dropped via forget() once a file fails or leaves the scan
+        # roots, and by each complete polling cycle for files no longer found.
+        # Shared by the scan, watchdog observer and pool threads: use _seen_lock
+        self._seen: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._seen_lock = Lock()
+        
+        # Files reported by watchdog that may still be written:
+        # path -> (monotonic time of the last event or check, last (mtime_ns, size) seen)
+        self._settling: Dict[str, Tuple[float, Optional[Tuple[int, int]]]] = {}
+        self._settling_lock = Lock()
+        
+        # Scan roots already reported as missing (warned about once)
+        self._missing_roots: Set[str] = set()
+        
+        # Optional event-driven backend
+        if use_watchdog and Observer is None:
+            logger.warning("watchdog is not installed, falling back to polling scans")
+            use_watchdog = False
+        self.use_watchdog = use_watchdog
+        self._observer = None
+        self._watches: Dict[str, Any] = {}
         
         self.is_running = False
         
-        logger.info(f"FileScanner initialized with interval: {scan_interval}s, extensions: {self.supported_extensions}")
+        logger.info(f"FileScanner initialized with {'watchdog events' if use_watchdog else f'interval: {scan_interval}s'}, "
+                    f"workers: {self.max_workers}, extensions: {self.supported_extensions}")
     
     def add_scan_path(self, path: str, recursive: bool = True) -> bool:
         """Add a directory to scan.
@@ -66,7 +173,12 @@ class FileScanner:
             logger.error(f"Scan path is not a directory: {scan_path}")
             return False
         
-        self.scan_paths.add((str(scan_path), recursive))
+        entry = (str(scan_path), recursive)
+        with self._scan_paths_lock:
+            if entry not in self._scan_paths_snapshot:
+                self._scan_paths_snapshot = self._scan_paths_snapshot + (entry,)
+        if self._observer is not None:
+            self._schedule_watch(str(scan_path), recursive)
         logger.info(f"Added scan path: {scan_path} (recursive={recursive})")
         return True
     
@@ -77,41 +189,179 @@ class FileScanner:
             path: Directory path to remove
         """
         scan_path = str(Path(path))
-        self.scan_paths = {(p, r) for p, r in self.scan_paths if p != scan_path}
+        with self._scan_paths_lock:
+            self._scan_paths_snapshot = tuple(
+                (p, r) for p, r in self._scan_paths_snapshot if p != scan_path
+            )
+        watch = self._watches.pop(scan_path, None)
+        if watch is not None and self._observer is not None:
+            self._observer.unschedule(watch)
         logger.info(f"Removed scan path: {scan_path}")
     
-    def _is_image_file(self, file_path: Path) -> bool:
-        """Check if file is a supported image format."""
-        return file_path.suffix.lower() in self.supported_extensions
+    @property
+    def scan_paths(self) -> Tuple[Tuple[str, bool], ...]:
+        """Current (path, recursive) scan roots as an immutable snapshot."""
+        return self._scan_paths_snapshot
     
-    def _scan_directory(self, directory: Path, recursive: bool) -> List[Path]:
-        """Scan directory for image files.
+    def _schedule_watch(self, path: str, recursive: bool):
+        """Register one watch per scan root with the running observer."""
+        try:
+            self._watches[path] = self._observer.schedule(
+                _ScanEventHandler(self), path, recursive=recursive
+            )
+        except Exception as e:
+            logger.error(f"Failed to watch {path}: {e}")
+    
+    def _note_event_path(self, path: str):
+        """Record a create or write event; the file is queued once it settles."""
+        if not self._is_image_file(os.path.basename(path)):
+            return
+        with self._settling_lock:
+            previous = self._settling.get(path)
+            self._settling[path] = (time.monotonic(), previous[1] if previous else None)
+    
+    def _settle_events(self):
+        """Queue files whose size and mtime stopped changing since the last check."""
+        now = time.monotonic()
+        with self._settling_lock:
+            due = [(path, signature) for path, (last, signature) in self._settling.items()
+                   if now - last >= EVENT_SETTLE_TIME]
+        
+        for path, previous in due:
+            try:
+                file_stat = os.stat(path, follow_symlinks=False)
+            except OSError:
+                file_stat = None  # Gone (e.g. temporary file renamed away)
+            signature = None if file_stat is None else (file_stat.st_mtime_ns, file_stat.st_size)
+            with self._settling_lock:
+                last, _ = self._settling.get(path, (None, None))
+                if last is None or last > now:
+                    continue  # Queued on close, or written again meanwhile
+                if file_stat is not None and signature != previous:
+                    self._settling[path] = (now, signature)
+                    continue
+                del self._settling[path]
+            if file_stat is not None:
+                self._enqueue_stat(path, file_stat)
+    
+    def _enqueue_event_path(self, path: str):
+        """Queue a file that watchdog reported as closed after writing or renamed into place."""
+        if not self._is_image_file(os.path.basename(path)):
+            return
+        with self._settling_lock:
+            self._settling.pop(path, None)
+        try:
+            file_stat = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return  # Already gone (e.g. temporary file)
+        self._enqueue_stat(path, file_stat)
+    
+    def _enqueue_stat(self, path: str, file_stat: os.stat_result):
+        """Queue an event-reported file unless it is unchanged since last queued."""
+        if not self._mark_seen((file_stat.st_dev, file_stat.st_ino), file_stat):
+            return
+        
+        self.file_queue.append((path, file_stat))
+        self._has_items.set()
+        logger.debug("Added file to queue from event: %s", path)
+    
+    def forget(self, file_stat: os.stat_result):
+        """Drop a file from the already-queued set.
+        
+        The callback calls this when processing a file failed, so the next scan
+        or event retries it, and after moving or deleting a file, so the set
+        only holds files that are still in the scan roots.
         
         Args:
-            directory: Directory to scan
-            recursive: Whether to scan subdirectories
+            file_stat: Stat result the file was queued with
+        """
+        with self._seen_lock:
+            self._seen.pop((file_stat.st_dev, file_stat.st_ino), None)
+    
+    def _mark_seen(self, key: Tuple[int, int], file_stat: os.stat_result) -> bool:
+        """Record a file as queued.
         
         Returns:
-            List of image file paths found
+            True if the file is new or changed since it was last queued
         """
-        image_files = []
+        signature = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._seen_lock:
+            if self._seen.get(key) == signature:
+                return False
+            self._seen[key] = signature
+        return True
+    
+    def _is_image_file(self, name: str) -> bool:
+        """Check if a file name has a supported image extension."""
+        return name[-self._max_ext_len:].lower().endswith(self._ext_tuple)
+    
+    def _scan_directory(self, directory: str, recursive: bool,
+                        found: Optional[Set[Tuple[int, int]]] = None) -> Iterator[Tuple[str, os.stat_result]]:
+        """Scan directory for image files.
         
-        try:
-            if recursive:
-                # Recursive scan using glob
-                for ext in self.supported_extensions:
-                    pattern = f"**/*{ext}"
-                    image_files.extend(directory.glob(pattern))
-            else:
-                # Non-recursive scan
-                for item in directory.iterdir():
-                    if item.is_file() and self._is_image_file(item):
-                        image_files.append(item)
+        Paths stay plain strings throughout the scan; a Path is only built
+        when the file reaches the processing callback.
         
-        except Exception as e:
-            logger.error(f"Error scanning directory {directory}: {e}")
+        Args:
+            directory: Directory to scan
+            recursive: Whether to scan subdirectories
+            found: If given, receives the (st_dev, st_ino) key of every image
+                file present, queued or not
         
-        return image_files
+        Yields:
+            (image file path, stat result) tuples for files that are new or
+            have changed since they were last queued, as they are found
+        """
+        ext_tuple = self._ext_tuple
+        max_ext_len = self._max_ext_len
+        excluded_dir_names = self.excluded_dir_names
+        skip_hidden_dirs = self.skip_hidden_dirs
+        mark_seen = self._mark_seen
+        
+        # 单次遍历：所有扩展名共用一次 os.scandir，只为匹配的文件构造 Path
+        root = os.fspath(directory)
+        pending_dirs = [root]
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                name = entry.name
+                                if recursive and name not in excluded_dir_names and not (
+                                        skip_hidden_dirs and name.startswith('.')):
+                                    pending_dirs.append(entry.path)
+                                continue
+                            
+                            name = entry.name
+                            if (name[-max_ext_len:].lower().endswith(ext_tuple)
+                                    and entry.is_file(follow_symlinks=False)):
+                                # 复用扫描时的 stat 结果，下游无需再次 stat
+                                file_stat = entry.stat(follow_symlinks=False)
+                                
+                                # 跳过上次入队后未发生变化的文件
+                                key = (file_stat.st_dev, file_stat.st_ino)
+                                if found is not None:
+                                    found.add(key)
+                                if not mark_seen(key, file_stat):
+                                    continue
+                                
+                                yield entry.path, file_stat
+                        except OSError as e:
+                            logger.debug(f"Error reading entry {entry.path}: {e}")
+                
+                if current_dir == root:
+                    self._missing_roots.discard(root)
+            
+            except FileNotFoundError:
+                if current_dir != root:
+                    logger.debug(f"Directory removed during scan: {current_dir}")
+                elif root not in self._missing_roots:
+                    self._missing_roots.add(root)
+                    logger.warning(f"Scan path no longer exists: {root}")
+            except Exception as e:
+                logger.error(f"Error scanning directory {current_dir}: {e}")
     
     def _scan_worker(self):
         """Worker thread for scanning directories."""
@@ -119,24 +369,34 @@ class FileScanner:
         
         while not self.stop_event.is_set():
             try:
-                # Scan all configured paths
-                for scan_path, recursive in self.scan_paths:
+                # Scan all configured paths (one snapshot per cycle)
+                found: Set[Tuple[int, int]] = set()
+                for scan_path, recursive in self._scan_paths_snapshot:
                     if self.stop_event.is_set():
                         break
                     
-                    directory = Path(scan_path)
-                    if not directory.exists():
-                        logger.warning(f"Scan path no longer exists: {directory}")
-                        continue
-                    
-                    # Scan for image files
-                    image_files = self._scan_directory(directory, recursive)
-                    
-                    # Add found files to queue
-                    for file_path in image_files:
-                        if not self.stop_event.is_set():
-                            self.file_queue.put(file_path)
-                            logger.debug(f"Added file to queue: {file_path.name}")
+                    # Queue files as they are found so processing overlaps the scan
+                    # (a missing root is reported by _scan_directory)
+                    for file_path, file_stat in self._scan_directory(scan_path, recursive, found):
+                        if self.stop_event.is_set():
+                            break
+                        self.file_queue.append((file_path, file_stat))
+                        self._has_items.set()
+                        logger.debug("Added file to queue: %s", file_path)
+                
+                if self._observer is None and not self.stop_event.is_set():
+                    # Complete polling cycle: forget files that were deleted or moved
+                    # away (with watchdog, events may add keys the scan never saw)
+                    with self._seen_lock:
+                        for key in self._seen.keys() - found:
+                            del self._seen[key]
+                
+                # With watchdog the initial scan only seeds the queue; events take
+                # over and this thread only queues files once they have settled
+                if self._observer is not None:
+                    while not self.stop_event.wait(EVENT_SETTLE_TIME / 4):
+                        self._settle_events()
+                    break
                 
                 # Wait for next scan interval
                 self.stop_event.wait(self.scan_interval)
@@ -153,21 +413,23 @@ class FileScanner:
         
         while not self.stop_event.is_set():
             try:
-                # Get file from queue with timeout
-                try:
-                    file_path = self.file_queue.get(timeout=1.0)
-                except:
+                # Wait for new files with timeout, then take a batch from the queue
+                if not self._has_items.wait(timeout=1.0):
                     continue  # Timeout, check stop event
-                
-                # Process the file
+                batch = []
                 try:
-                    self.file_processor_callback(file_path)
-                    logger.debug(f"Processed file: {file_path.name}")
-                except Exception as e:
-                    logger.error(f"Error processing file {file_path.name}: {e}")
+                    for _ in range(DRAIN_BATCH_SIZE):
+                        batch.append(self.file_queue.popleft())
+                except IndexError:
+                    # Queue drained; re-check after clearing so a concurrent append is not missed
+                    self._has_items.clear()
+                    if self.file_queue:
+                        self._has_items.set()
                 
-                # Mark task as done
-                self.file_queue.task_done()
+                # Hand the files to the worker pool
+                for file_path, file_stat in batch:
+                    if not self._submit(file_path, file_stat):
+                        break
                 
             except Exception as e:
                 logger.error(f"Error in process worker: {e}")
@@ -175,6 +437,28 @@ class FileScanner:
         
         logger.info("File processor worker stopped")
     
+    def _submit(self, file_path: str, file_stat: Optional[os.stat_result]) -> bool:
+        """Submit one file to the pool, waiting while too many are in flight.
+        
+        Returns:
+            True if submitted, False if the scanner was stopped while waiting
+        """
+        while not self._in_flight.acquire(timeout=1.0):
+            if self.stop_event.is_set():
+                return False
+        self._pool.submit(self._run_callback, file_path, file_stat)
+        return True
+    
+    def _run_callback(self, file_path: str, file_stat: Optional[os.stat_result]):
+        """Run the processing callback for one file on a pool thread."""
+        try:
+            self.file_processor_callback(Path(file_path), file_stat)
+            logger.debug("Processed file: %s", file_path)
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {e}")
+        finally:
+            self._in_flight.release()
+    
     def start(self) -> bool:
         """Start the file scanner.
         
@@ -191,6 +475,15 @@ class FileScanner:
         
         try:
             self.stop_event.clear()
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="file-processor")
+            
+            # Start watching before the seeding scan so no change is missed in between
+            if self.use_watchdog:
+                self._observer = Observer()
+                for scan_path, recursive in self.scan_paths:
+                    self._schedule_watch(scan_path, recursive)
+                self._observer.start()
             
             # Start worker threads
             self.scan_thread = Thread(target=self._scan_worker, daemon=True)
@@ -218,6 +511,12 @@ class FileScanner:
         # Signal threads to stop
         self.stop_event.set()
         
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5.0)
+            self._observer = None
+            self._watches.clear()
+        
         # Wait for threads to finish
         if self.scan_thread and self.scan_thread.is_alive():
             self.scan_thread.join(timeout=5.0)
@@ -225,6 +524,11 @@ class FileScanner:
         if self.process_thread and self.process_thread.is_alive():
             self.process_thread.join(timeout=5.0)
         
+        # Let files already handed to the pool finish
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        
         self.is_running = False
         logger.info("File scanner stopped")
     
@@ -234,7 +538,7 @@ class FileScanner:
         Returns:
             Number of files in processing queue
         """
-        return self.file_queue.qsize()
+        return len(self.file_queue)
     
     def is_queue_empty(self) -> bool:
         """Check if processing queue is empty.
@@ -242,7 +546,7 @@ class FileScanner:
         Returns:
             True if queue is empty, False otherwise
         """
-        return self.file_queue.empty()
+        return not self.file_queue
 
 # Backward compatibility alias
 FileMonitor = FileScanner
\ No newline at end of file
@@ -4,27 +4,101 @@
 支持高性能图像处理、缓存机制和完善的错误处理
 """
 
+import array
+import json
 import logging
-import hashlib
+import os
+import shutil
+import sqlite3
+import subprocess
+from stat import S_ISREG
+import struct
 import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field, replace
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Set, Tuple
-from functools import lru_cache
-from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+from threading import Lock
 
-from PIL import Image, ImageFile
+from PIL import Image, UnidentifiedImageError
 from PIL.ExifTags import TAGS
 
+# 可选：orjson 加速持久化缓存的序列化，未安装时使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 可选：pyexiv2（C++ exiv2 绑定）作为EXIF解析后端
+try:
+    import pyexiv2
+except ImportError:
+    pyexiv2 = None
+
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
 # 支持的图像扩展名
-SUPPORTED_EXTENSIONS = {
+SUPPORTED_EXTENSIONS: frozenset = frozenset({
     '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.ico'
+})
+
+# 常见图像格式的文件头签名（WebP 需额外检查 RIFF 容器类型，见 _match_magic）
+MAGIC_SIGNATURES = {
+    b'\xff\xd8\xff': 'JPEG',
+    b'\x89PNG\r\n\x1a\n': 'PNG',
+    b'GIF8': 'GIF',
+    b'BM': 'BMP',
+    b'II*\x00': 'TIFF',
+    b'MM\x00*': 'TIFF',
+    b'\x00\x00\x01\x00': 'ICO',
 }
 
-# 启用截断图像加载以提高性能
-ImageFile.LOAD_TRUNCATED_IMAGES = True
+# 按签名前2字节分组，匹配时只需一次字典查找和少量 startswith
+_MAGIC_BY_PREFIX: Dict[bytes, Tuple[Tuple[bytes, str], ...]] = {}
+for _signature, _format_name in MAGIC_SIGNATURES.items():
+    _MAGIC_BY_PREFIX[_signature[:2]] = _MAGIC_BY_PREFIX.get(_signature[:2], ()) + ((_signature, _format_name),)
+_MAGIC_BY_PREFIX[b'RI'] = ()  # RIFF....WEBP 单独判断
+del _signature, _format_name
+
+# PIL 后端保留的EXIF标签（其余标签直接跳过，不做类型判断和解码）
+_WANTED_TAGS = frozenset({
+    'DateTimeOriginal', 'DateTimeDigitized', 'DateTime', 'Make', 'Model',
+    'Orientation', 'Software', 'Artist', 'Copyright', 'ImageDescription',
+    'ExposureTime', 'FNumber', 'ISOSpeedRatings', 'FocalLength', 'LensModel',
+    'ExifImageWidth', 'ExifImageHeight',
+})
+# 按数值 tag_id 预先建立的小表，循环中无需查询完整的 PIL TAGS 字典
+_WANTED_TAG_IDS = {tag_id: name for tag_id, name in TAGS.items() if name in _WANTED_TAGS}
+_SERIALIZABLE_TYPES = frozenset({str, int, float, bool})
+_EXIF_IFD_POINTER = 0x8769
+
+# 可选的EXIF解析后端：PIL（默认）、pyexiv2、常驻 exiftool 进程
+EXIF_BACKENDS = ('pil', 'pyexiv2', 'exiftool')
+
+# exiftool 后端显式请求的标签，避免解析和传输全部元数据
+EXIFTOOL_TAGS = (
+    'EXIF:DateTimeOriginal', 'EXIF:Make', 'EXIF:Model', 'EXIF:Orientation',
+    'EXIF:ExposureTime', 'EXIF:FNumber', 'EXIF:ISO', 'EXIF:FocalLength',
+    'EXIF:LensModel', 'EXIF:GPSLatitude', 'EXIF:GPSLongitude',
+)
+
+# get_image_info 中允许复制的图像元数据键（icc_profile 可能有数十KB，
+# 仅在 include_icc=True 时复制）
+_SAFE_META = frozenset({'dpi', 'quality', 'transparency', 'gamma'})
+
+# get_image_info 结果缓存的默认最大条目数（按 inode 缓存，LRU 淘汰）
+INFO_CACHE_SIZE = 50_000
+
+# Image.open 可能抛出的异常（UnidentifiedImageError 是 OSError 的子类，此处显式列出）
+_IMAGE_OPEN_ERRORS = (OSError, UnidentifiedImageError, Image.DecompressionBombError)
+
+# img.verify() 遇到截断或损坏的数据时可能抛出的异常。是否接受截断图像按
+# ImageProcessor.allow_truncated 逐个文件判断，不修改进程级的
+# ImageFile.LOAD_TRUNCATED_IMAGES
+_TRUNCATED_IMAGE_ERRORS = (OSError, SyntaxError, EOFError, struct.error)
+
 
 class ImageProcessorError(Exception):
     """图像处理器自定义异常类"""
@@ -38,6 +112,240 @@ class ImageInfoExtractionError(ImageProcessorError):
     """图像信息提取错误"""
     pass
 
+@dataclass(slots=True)
+class ImageInfo:
+    """
+    get_image_info 的返回结果
+    
+    使用 __slots__ 数据类代替字典，大批量扫描时每条记录占用更少内存、
+    属性访问更快；需要字典的场景（序列化、合并到其他字典）使用 as_dict()
+    """
+    filename: str
+    file_path: str
+    width: int
+    height: int
+    format: str
+    mode: str
+    size_bytes: int
+    aspect_ratio: float
+    modified_time: float
+    processing_time_ns: Optional[int] = None  # 仅在 record_timing=True 时记录
+    pixel_count: Optional[int] = None
+    bits_per_pixel: Optional[int] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)  # dpi、quality 等安全元数据
+    exif: Optional[Dict[str, Any]] = None
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        转换为旧版的扁平字典格式（未设置的可选字段不出现，元数据键平铺）
+        
+        Returns:
+            图像信息字典
+        """
+        info = {
+            'filename': self.filename,
+            'file_path': self.file_path,
+            'width': self.width,
+            'height': self.height,
+            'format': self.format,
+            'mode': self.mode,
+            'size_bytes': self.size_bytes,
+            'aspect_ratio': self.aspect_ratio,
+            'modified_time': self.modified_time,
+        }
+        if self.processing_time_ns is not None:
+            info['processing_time_ns'] = self.processing_time_ns
+        if self.pixel_count is not None:
+            info['pixel_count'] = self.pixel_count
+        if self.bits_per_pixel is not None:
+            info['bits_per_pixel'] = self.bits_per_pixel
+        info.update(self.metadata)
+        if self.exif is not None:
+            info['exif'] = self.exif
+        return info
+
+@dataclass(slots=True)
+class BatchResult:
+    """
+    scan_batch 的列式结果（每列一个连续数组，按输入顺序对齐）
+    
+    无法识别的尺寸、大小和修改时间记为0
+    """
+    file_paths: List[str] = field(default_factory=list)
+    valid: array.array = field(default_factory=lambda: array.array('b'))
+    widths: array.array = field(default_factory=lambda: array.array('l'))
+    heights: array.array = field(default_factory=lambda: array.array('l'))
+    size_bytes: array.array = field(default_factory=lambda: array.array('q'))
+    mtimes: array.array = field(default_factory=lambda: array.array('d'))
+    
+    def __len__(self) -> int:
+        return len(self.file_paths)
+    
+    @property
+    def total_size(self) -> int:
+        """所有文件的总字节数"""
+        return sum(self.size_bytes)
+    
+    @property
+    def valid_count(self) -> int:
+        """文件头有效的图像数量"""
+        return sum(self.valid)
+
+class SQLiteInfoCache:
+    """
+    get_image_info 结果的持久化缓存（SQLite，WAL 模式）
+    
+    以文件路径为主键，记录文件大小和修改时间；重新扫描大型图库时，
+    未变化的文件直接从磁盘读取结果，无需再次用PIL打开
+    """
+    
+    # 累计多少次写入后提交一次事务
+    COMMIT_INTERVAL = 256
+    
+    def __init__(self, db_path: str):
+        """
+        打开（必要时创建）缓存数据库
+        
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS image_info ('
+            'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+            'options INTEGER NOT NULL, info_json TEXT NOT NULL)'
+        )
+        self._conn.commit()
+        self._lock = Lock()
+        self._pending_writes = 0
+    
+    def get(self, path: str, size: int, mtime_ns: int, options: int) -> Optional[ImageInfo]:
+        """
+        读取缓存的图像信息
+        
+        Args:
+            path: 文件路径
+            size: 当前文件大小
+            mtime_ns: 当前修改时间（纳秒）
+            options: 提取选项位掩码
+        
+        Returns:
+            文件大小、修改时间和选项都一致时返回 ImageInfo，否则返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT info_json FROM image_info '
+                'WHERE path = ? AND size = ? AND mtime_ns = ? AND options = ?',
+                (path, size, mtime_ns, options)
+            ).fetchone()
+        if row is None:
+            return None
+        data = orjson.loads(row[0]) if orjson is not None else json.loads(row[0])
+        # JSON 不区分元组和列表，还原 dpi 等元组形式的元数据
+        data['metadata'] = {key: tuple(value) if isinstance(value, list) else value
+                            for key, value in data['metadata'].items()}
+        return ImageInfo(**data)
+    
+    def put(self, path: str, size: int, mtime_ns: int, options: int, info: ImageInfo) -> bool:
+        """
+        写入（或覆盖）图像信息
+        
+        Args:
+            path: 文件路径
+            size: 文件大小
+            mtime_ns: 修改时间（纳秒）
+            options: 提取选项位掩码
+            info: 图像信息
+        
+        Returns:
+            写入成功返回True；结果含无法序列化的值（如 bytes 元数据）时返回False
+        """
+        try:
+            data = asdict(info)
+            info_json = orjson.dumps(data).decode() if orjson is not None else json.dumps(data)
+        except (TypeError, ValueError):
+            return False
+        
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO image_info (path, size, mtime_ns, options, info_json) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (path, size, mtime_ns, options, info_json)
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.COMMIT_INTERVAL:
+                self._conn.commit()
+                self._pending_writes = 0
+        return True
+    
+    def close(self):
+        """提交未完成的写入并关闭数据库"""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+class _ExifToolProcess:
+    """
+    常驻的 exiftool -stay_open 进程
+    
+    所有请求共用一个进程，通过标准输入传递参数、以 -execute 分隔批次，
+    输出以 JSON 返回
+    """
+    
+    def __init__(self, executable: str = 'exiftool'):
+        self._proc = subprocess.Popen(
+            [executable, '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8'
+        )
+        self._lock = Lock()
+    
+    def query(self, paths: List[str], tags: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        对一批文件执行一次 exiftool 查询
+        
+        Args:
+            paths: 文件路径列表
+            tags: 要读取的标签（如 'EXIF:Make'）
+        
+        Returns:
+            每个文件一个字典，包含 SourceFile 和读取到的标签
+        
+        Raises:
+            OSError: 进程已退出或通信失败
+        """
+        args = ['-json', '-charset', 'filename=utf8']
+        args.extend(f'-{tag}' for tag in tags)
+        args.extend(paths)
+        args.append('-execute')
+        
+        with self._lock:
+            self._proc.stdin.write('\n'.join(args) + '\n')
+            self._proc.stdin.flush()
+            
+            lines = []
+            while True:
+                line = self._proc.stdout.readline()
+                if not line:
+                    raise OSError("exiftool 进程意外退出")
+                if line.rstrip() == '{ready}':
+                    break
+                lines.append(line)
+        
+        output = ''.join(lines).strip()
+        return json.loads(output) if output else []
+    
+    def close(self):
+        """通知 exiftool 退出并等待进程结束"""
+        try:
+            self._proc.stdin.write('-stay_open\nFalse\n')
+            self._proc.stdin.flush()
+            self._proc.wait(timeout=5)
+        except Exception:
+            self._proc.kill()
+
 class ImageProcessor:
     """
     优化的图像处理器类
@@ -50,16 +358,41 @@ class ImageProcessor:
     - 支持EXIF数据提取
     """
     
-    def __init__(self, cache_size: int = 128, enable_exif: bool = False):
+    def __init__(self, cache_size: int = INFO_CACHE_SIZE, enable_exif: bool = False,
+                 exif_backend: str = 'pil', allow_truncated: bool = False,
+                 record_timing: bool = False, persistent_cache_path: Optional[str] = None):
         """
         初始化图像处理器
         
         Args:
-            cache_size: LRU缓存大小，默认128
+            cache_size: 图像信息LRU缓存容量（条目数），默认 INFO_CACHE_SIZE
             enable_exif: 是否启用EXIF数据提取，默认False
+            exif_backend: EXIF解析后端（'pil'、'pyexiv2' 或 'exiftool'），
+                所选后端不可用时回退到 'pil'
+            allow_truncated: 完整验证时是否接受截断的图像文件，默认False
+            record_timing: 是否在 ImageInfo.processing_time_ns 中记录提取耗时，默认False
+            persistent_cache_path: SQLite 持久化缓存文件路径，设置后在内存LRU之下
+                增加一层跨进程复用的磁盘缓存，默认不启用
+        
+        Raises:
+            ValueError: 未知的EXIF后端
         """
+        if exif_backend not in EXIF_BACKENDS:
+            raise ValueError(f"未知的EXIF后端: {exif_backend}")
+        if exif_backend == 'pyexiv2' and pyexiv2 is None:
+            logger.warning("pyexiv2 未安装，EXIF提取回退到PIL")
+            exif_backend = 'pil'
+        elif exif_backend == 'exiftool' and shutil.which('exiftool') is None:
+            logger.warning("未找到 exiftool，EXIF提取回退到PIL")
+            exif_backend = 'pil'
+        
         self.cache_size = cache_size
         self.enable_exif = enable_exif
+        self.exif_backend = exif_backend
+        self.allow_truncated = allow_truncated
+        self.record_timing = record_timing
+        self._exiftool: Optional[_ExifToolProcess] = None
+        self._exiftool_lock = Lock()
         self._stats = {
             'processed_files': 0,
             'cache_hits': 0,
@@ -68,148 +401,209 @@ class ImageProcessor:
             'extraction_errors': 0
         }
         
-        logger.info(f"图像处理器初始化完成 - 缓存大小: {cache_size}, EXIF支持: {enable_exif}")
+        # 图像信息缓存：(st_dev, st_ino) -> (文件签名, 信息字典)
+        # 文件大小和修改时间不变时直接返回，无需再用PIL打开文件
+        self._info_cache: "OrderedDict[Tuple[int, int], Tuple[tuple, ImageInfo]]" = OrderedDict()
+        self._info_cache_lock = Lock()
+        
+        # 可选的磁盘缓存（内存LRU未命中时查询）
+        self._persistent_cache: Optional[SQLiteInfoCache] = (
+            SQLiteInfoCache(persistent_cache_path) if persistent_cache_path else None
+        )
+        
+        logger.debug(f"图像处理器初始化完成 - 缓存大小: {cache_size}, EXIF支持: {enable_exif}")
     
-    @lru_cache(maxsize=256)
     def is_supported_format(self, file_extension: str) -> bool:
         """
-        检查文件格式是否受支持（带缓存）
+        检查文件格式是否受支持（frozenset 成员检查）
         
         Args:
-            file_extension: 文件扩展名
+            file_extension: 文件扩展名（如 '.jpg'，不是完整路径）
         
         Returns:
             如果格式受支持返回True，否则返回False
         """
         return file_extension.lower() in SUPPORTED_EXTENSIONS
     
-    def _calculate_file_hash(self, file_path: Path, chunk_size: int = 8192) -> str:
+    @staticmethod
+    def _stat_once(file_path) -> Optional[os.stat_result]:
         """
-        计算文件哈希值用于缓存键
+        获取文件 stat 结果（每个文件只调用一次，存在性、类型、大小和
+        修改时间都由该结果推导）
         
         Args:
-            file_path: 文件路径
-            chunk_size: 读取块大小
+            file_path: 文件路径，或 os.scandir 产生的 DirEntry（复用其缓存的 stat）
         
         Returns:
-            文件的MD5哈希值
+            stat 结果，文件不存在时返回None
         """
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(chunk_size), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
-        except Exception as e:
-            logger.debug(f"计算文件哈希失败 {file_path.name}: {e}")
-            # 如果无法计算哈希，使用文件路径和修改时间作为替代
-            return f"{file_path}_{file_path.stat().st_mtime}"
+            if isinstance(file_path, os.DirEntry):
+                return file_path.stat()
+            return os.stat(file_path)
+        except FileNotFoundError:
+            return None
     
-    @contextmanager
-    def _safe_image_open(self, file_path: Path):
+    def get_image_info(self, file_path: Path, include_exif: bool = None,
+                       stat_result: Optional[os.stat_result] = None,
+                       include_pixel_count: bool = False,
+                       include_icc: bool = False) -> ImageInfo:
         """
-        安全的图像打开上下文管理器
+        提取图像信息（高性能优化版本）
         
         Args:
             file_path: 图像文件路径
+            include_exif: 是否包含EXIF数据，None时使用实例设置
+            stat_result: 已获取的文件 stat 结果，提供时跳过存在性检查和 stat 调用
+            include_pixel_count: 是否包含 pixel_count 字段，默认False
+            include_icc: 是否在 metadata 中包含 icc_profile，默认False
         
-        Yields:
-            PIL Image对象
+        Returns:
+            ImageInfo 对象（需要字典时调用 as_dict()）
         
         Raises:
-            ImageProcessorError: 图像打开失败
+            ImageInfoExtractionError: 信息提取失败
         """
-        img = None
         try:
-            img = Image.open(file_path)
-            yield img
+            suffix = file_path.suffix.lower()
+            if suffix not in SUPPORTED_EXTENSIONS:
+                raise ValueError(f"不支持的图像格式: {suffix}")
+            
+            # 获取文件统计信息（单次 stat）
+            file_stat = stat_result if stat_result is not None else self._stat_once(file_path)
+            if file_stat is None:
+                raise FileNotFoundError(f"图像文件不存在: {file_path}")
+            
+            want_exif = include_exif if include_exif is not None else self.enable_exif
+            
+            # 文件未变化时直接返回缓存的信息
+            cache_key = (file_stat.st_dev, file_stat.st_ino)
+            signature = (file_stat.st_mtime_ns, file_stat.st_size, want_exif,
+                         include_pixel_count, include_icc)
+            with self._info_cache_lock:
+                cached = self._info_cache.get(cache_key)
+                if cached is not None and cached[0] == signature:
+                    self._info_cache.move_to_end(cache_key)
+                    self._stats['cache_hits'] += 1
+                    # 返回副本，调用方修改结果不会影响缓存
+                    return replace(cached[1], filename=file_path.name, file_path=str(file_path))
+            
+            persistent_cache = self._persistent_cache
+            if persistent_cache is not None:
+                path_str = str(file_path)
+                options = (want_exif << 2) | (include_pixel_count << 1) | include_icc
+                info = persistent_cache.get(path_str, file_stat.st_size, file_stat.st_mtime_ns, options)
+                if info is not None:
+                    self._stats['cache_hits'] += 1
+                    self._remember_info(cache_key, signature, info)
+                    return info
+            
+            self._stats['cache_misses'] += 1
+            info = self._open_and_describe(file_path, file_stat, want_exif,
+                                           include_pixel_count, include_icc)
+            self._stats['processed_files'] += 1
+            if persistent_cache is not None:
+                persistent_cache.put(path_str, file_stat.st_size, file_stat.st_mtime_ns, options, info)
+            return info
+                
         except Exception as e:
-            logger.debug(f"打开图像失败 {file_path.name}: {e}")
-            raise ImageProcessorError(f"无法打开图像文件: {e}")
-        finally:
-            if img:
-                try:
-                    img.close()
-                except:
-                    pass
+            self._stats['extraction_errors'] += 1
+            logger.error(f"图像信息提取失败 {file_path.name}: {e}")
+            raise ImageInfoExtractionError(f"无法提取图像信息: {e}")
     
-    def get_image_info(self, file_path: Path, include_exif: bool = None) -> Dict[str, Any]:
+    def _open_and_describe(self, file_path: Path, file_stat: os.stat_result,
+                           want_exif: bool, include_pixel_count: bool,
+                           include_icc: bool = False) -> ImageInfo:
         """
-        提取图像信息（高性能优化版本）
+        打开一次图像并提取信息，结果写入信息缓存
+        
+        get_image_info 与 PIL 快速验证共用此入口，验证后紧接着的
+        get_image_info 调用可直接命中缓存，不再重复打开和解析文件头
         
         Args:
             file_path: 图像文件路径
-            include_exif: 是否包含EXIF数据，None时使用实例设置
+            file_stat: 文件 stat 结果
+            want_exif: 是否包含EXIF数据
+            include_pixel_count: 是否包含 pixel_count 字段
+            include_icc: 是否包含 icc_profile
         
         Returns:
-            包含图像信息的字典
+            ImageInfo 对象
         
         Raises:
-            ImageInfoExtractionError: 信息提取失败
+            ImageProcessorError: 图像打开失败
         """
-        start_time = time.time()
+        record_timing = self.record_timing
+        if record_timing:
+            start_ns = time.perf_counter_ns()
         
         try:
-            if not file_path.exists():
-                raise FileNotFoundError(f"图像文件不存在: {file_path}")
+            img = Image.open(file_path)
+        except _IMAGE_OPEN_ERRORS as e:
+            raise ImageProcessorError(f"无法打开图像文件: {e}") from e
+        
+        with img:
+            width, height = img.size
+            # 基本图像信息
+            info = ImageInfo(
+                filename=file_path.name,
+                file_path=str(file_path),
+                width=width,
+                height=height,
+                format=img.format or 'Unknown',
+                mode=img.mode,
+                size_bytes=file_stat.st_size,
+                aspect_ratio=round(width / height, 3) if height > 0 else 0,
+                modified_time=file_stat.st_mtime,
+            )
             
-            if not self.is_supported_format(file_path.suffix):
-                raise ValueError(f"不支持的图像格式: {file_path.suffix}")
+            if include_pixel_count:
+                info.pixel_count = width * height
             
-            # 获取文件统计信息
-            file_stat = file_path.stat()
+            # 添加颜色深度信息
+            if hasattr(img, 'bits'):
+                info.bits_per_pixel = img.bits
             
-            # 使用缓存键检查是否已处理过
-            cache_key = f"{file_path}_{file_stat.st_mtime}_{file_stat.st_size}"
+            # 添加安全的元数据
+            meta = img.info
+            if meta:
+                info.metadata = {key: meta[key] for key in _SAFE_META if key in meta}
+                if include_icc and 'icc_profile' in meta:
+                    info.metadata['icc_profile'] = meta['icc_profile']
             
-            with self._safe_image_open(file_path) as img:
-                # 基本图像信息
-                info = {
-                    'filename': file_path.name,
-                    'file_path': str(file_path),
-                    'width': img.width,
-                    'height': img.height,
-                    'format': img.format or 'Unknown',
-                    'mode': img.mode,
-                    'size_bytes': file_stat.st_size,
-                    'pixel_count': img.width * img.height,
-                    'aspect_ratio': round(img.width / img.height, 3) if img.height > 0 else 0,
-                    'modified_time': file_stat.st_mtime,
-                    'processing_time': 0  # 稍后更新
-                }
-                
-                # 添加颜色深度信息
-                if hasattr(img, 'bits'):
-                    info['bits_per_pixel'] = img.bits
-                
-                # 添加安全的元数据
-                if hasattr(img, 'info') and img.info:
-                    safe_keys = {'dpi', 'quality', 'transparency', 'gamma', 'icc_profile'}
-                    for key in safe_keys:
-                        if key in img.info:
-                            try:
-                                info[key] = img.info[key]
-                            except Exception as e:
-                                logger.debug(f"提取元数据 {key} 失败: {e}")
-                
-                # EXIF数据提取（可选）
-                if (include_exif if include_exif is not None else self.enable_exif):
-                    info['exif'] = self._extract_exif_data(img)
-                
-                # 计算处理时间
-                processing_time = time.time() - start_time
-                info['processing_time'] = round(processing_time * 1000, 2)  # 毫秒
-                
-                self._stats['processed_files'] += 1
-                logger.debug(f"图像信息提取完成 {file_path.name}: {info['width']}x{info['height']}, "
-                           f"耗时: {info['processing_time']}ms")
-                
-                return info
-                
-        except Exception as e:
-            self._stats['extraction_errors'] += 1
-            logger.error(f"图像信息提取失败 {file_path.name}: {e}")
-            raise ImageInfoExtractionError(f"无法提取图像信息: {e}")
+            # EXIF数据提取（可选）
+            if want_exif:
+                if self.exif_backend == 'pil':
+                    info.exif = self._extract_exif_data(img)
+                else:
+                    info.exif = self.extract_exif_batch([file_path]).get(str(file_path), {})
+        
+        # 计算处理时间（可选，原始纳秒值由调用方自行格式化）
+        if record_timing:
+            info.processing_time_ns = time.perf_counter_ns() - start_ns
+        # 惰性格式化：未开启DEBUG时不构造日志字符串
+        logger.debug("图像信息提取完成 %s: %sx%s", file_path.name, width, height)
+        
+        cache_key = (file_stat.st_dev, file_stat.st_ino)
+        signature = (file_stat.st_mtime_ns, file_stat.st_size, want_exif,
+                     include_pixel_count, include_icc)
+        self._remember_info(cache_key, signature, info)
+        return info
+    
+    def _remember_info(self, cache_key: Tuple[int, int], signature: tuple, info: ImageInfo):
+        """
+        将图像信息的副本写入内存LRU缓存
+        
+        Args:
+            cache_key: (st_dev, st_ino)
+            signature: 文件签名和提取选项
+            info: 图像信息
+        """
+        with self._info_cache_lock:
+            self._info_cache[cache_key] = (signature, replace(info))
+            self._info_cache.move_to_end(cache_key)
+            if len(self._info_cache) > self.cache_size:
+                self._info_cache.popitem(last=False)
     
     def _extract_exif_data(self, img: Image.Image) -> Dict[str, Any]:
         """
@@ -223,56 +617,167 @@ class ImageProcessor:
         """
         exif_data = {}
         try:
-            if hasattr(img, '_getexif') and img._getexif():
-                exif = img._getexif()
-                for tag_id, value in exif.items():
-                    tag = TAGS.get(tag_id, tag_id)
-                    try:
-                        # 只保存可序列化的数据
-                        if isinstance(value, (str, int, float, bool)):
-                            exif_data[tag] = value
-                        elif isinstance(value, bytes):
-                            exif_data[tag] = value.decode('utf-8', errors='ignore')[:100]  # 限制长度
-                    except Exception as e:
-                        logger.debug(f"处理EXIF标签 {tag} 失败: {e}")
+            exif = img.getexif()
+            if not exif:
+                return exif_data
+            
+            # getexif() 只包含 IFD0，拍摄参数位于 Exif 子IFD
+            tags = dict(exif)
+            tags.update(exif.get_ifd(_EXIF_IFD_POINTER))
+            
+            for tag_id, value in tags.items():
+                tag = _WANTED_TAG_IDS.get(tag_id)
+                if tag is None:
+                    continue
+                # 只保存可序列化的数据
+                value_type = type(value)
+                if value_type in _SERIALIZABLE_TYPES:
+                    exif_data[tag] = value
+                elif value_type is bytes:
+                    exif_data[tag] = value[:100].decode('utf-8', errors='ignore')  # 先截断再解码，限制长度
         except Exception as e:
             logger.debug(f"提取EXIF数据失败: {e}")
         
         return exif_data
     
-    def validate_image(self, file_path: Path, quick_check: bool = True) -> bool:
+    def extract_exif_batch(self, file_paths: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量提取EXIF数据（使用配置的后端）
+        
+        exiftool 后端把整批文件交给常驻进程一次处理，避免每个文件的进程启动开销
+        
+        Args:
+            file_paths: 图像文件路径
+        
+        Returns:
+            文件路径字符串 -> EXIF数据字典；提取失败的文件对应空字典
+        """
+        paths = [str(p) for p in file_paths]
+        if not paths:
+            return {}
+        
+        if self.exif_backend == 'exiftool':
+            try:
+                return self._extract_exif_exiftool(paths)
+            except Exception as e:
+                logger.debug(f"exiftool 提取EXIF数据失败: {e}")
+                return {path: {} for path in paths}
+        
+        if self.exif_backend == 'pyexiv2':
+            return {path: self._extract_exif_pyexiv2(path) for path in paths}
+        
+        results = {}
+        for path in paths:
+            try:
+                with Image.open(path) as img:
+                    results[path] = self._extract_exif_data(img)
+            except Exception as e:
+                logger.debug(f"提取EXIF数据失败 {path}: {e}")
+                results[path] = {}
+        return results
+    
+    def _extract_exif_pyexiv2(self, file_path: str) -> Dict[str, Any]:
+        """
+        使用 pyexiv2 提取EXIF数据
+        
+        Args:
+            file_path: 图像文件路径
+        
+        Returns:
+            EXIF数据字典（键为 exiv2 标签名，如 'Exif.Image.Make'）
+        """
+        try:
+            img = pyexiv2.Image(file_path)
+            try:
+                return {tag: value[:100] if isinstance(value, str) else value
+                        for tag, value in img.read_exif().items()}
+            finally:
+                img.close()
+        except Exception as e:
+            logger.debug(f"pyexiv2 提取EXIF数据失败 {file_path}: {e}")
+            return {}
+    
+    def _extract_exif_exiftool(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        通过常驻 exiftool 进程批量提取EXIF数据
+        
+        Args:
+            paths: 图像文件路径字符串列表
+        
+        Returns:
+            文件路径字符串 -> EXIF数据字典
+        
+        Raises:
+            OSError: exiftool 进程启动或通信失败
+        """
+        with self._exiftool_lock:
+            if self._exiftool is None:
+                self._exiftool = _ExifToolProcess()
+            exiftool = self._exiftool
+        
+        results = {path: {} for path in paths}
+        for record in exiftool.query(paths, EXIFTOOL_TAGS):
+            source = record.pop('SourceFile', None)
+            if source in results:
+                results[source] = record
+        return results
+    
+    def close(self):
+        """关闭常驻的 exiftool 进程和持久化缓存（如已启用）"""
+        with self._exiftool_lock:
+            if self._exiftool is not None:
+                self._exiftool.close()
+                self._exiftool = None
+        if self._persistent_cache is not None:
+            self._persistent_cache.close()
+            self._persistent_cache = None
+    
+    def validate_image(self, file_path: Path, quick_check: bool = True,
+                       stat_result: Optional[os.stat_result] = None,
+                       header: Optional[bytes] = None) -> bool:
         """
         验证图像文件（优化版本）
         
         Args:
             file_path: 图像文件路径
             quick_check: 是否使用快速检查模式
+            stat_result: 已获取的文件 stat 结果，提供时跳过存在性检查和 stat 调用
+            header: 已读取的文件头（至少12字节，如哈希时一并取出），
+                提供时快速模式不再打开文件读取文件头
         
         Returns:
             如果图像有效返回True，否则返回False
         """
         try:
-            # 基本文件检查
-            if not file_path.exists() or not file_path.is_file():
+            # 扩展名检查（不访问文件系统，最先执行）
+            if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
                 return False
             
+            # 基本文件检查
+            if stat_result is None:
+                stat_result = self._stat_once(file_path)
+                if stat_result is None or not S_ISREG(stat_result.st_mode):
+                    return False
+            
             # 文件大小检查
-            if file_path.stat().st_size == 0:
+            if stat_result.st_size == 0:
                 logger.debug(f"空文件: {file_path.name}")
                 return False
             
-            # 扩展名检查
-            if not self.is_supported_format(file_path.suffix):
-                return False
-            
             # 快速模式：只检查文件头
             if quick_check:
-                return self._quick_image_validation(file_path)
+                return self._quick_image_validation(file_path, stat_result, header)
             
             # 完整验证模式
-            with self._safe_image_open(file_path) as img:
+            with Image.open(file_path) as img:
                 # 验证图像头部信息
-                img.verify()
+                try:
+                    img.verify()
+                except _TRUNCATED_IMAGE_ERRORS as e:
+                    # 文件头已成功解析，只是数据不完整
+                    if not self.allow_truncated:
+                        raise
+                    logger.debug("接受截断图像 %s: %s", file_path.name, e)
                 return True
                 
         except Exception as e:
@@ -280,58 +785,216 @@ class ImageProcessor:
             logger.debug(f"图像验证失败 {file_path.name}: {e}")
             return False
     
-    def _quick_image_validation(self, file_path: Path) -> bool:
+    def _quick_image_validation(self, file_path: Path,
+                                stat_result: Optional[os.stat_result] = None,
+                                header: Optional[bytes] = None) -> bool:
         """
         快速图像验证（只检查文件头）
         
         Args:
             file_path: 图像文件路径
+            stat_result: 已获取的文件 stat 结果
+            header: 已读取的文件头，提供时直接匹配魔数
         
         Returns:
             验证结果
         """
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(32)  # 读取前32字节
-                
-                # 检查常见图像格式的文件头
-                if header.startswith(b'\xff\xd8\xff'):  # JPEG
-                    return True
-                elif header.startswith(b'\x89PNG\r\n\x1a\n'):  # PNG
-                    return True
-                elif header.startswith(b'GIF8'):  # GIF
-                    return True
-                elif header.startswith(b'BM'):  # BMP
-                    return True
-                elif header.startswith(b'RIFF') and b'WEBP' in header:  # WebP
+            # 检查常见图像格式的文件头
+            if header is not None:
+                if self._match_magic(header):
                     return True
-                elif header.startswith((b'II*\x00', b'MM\x00*')):  # TIFF
-                    return True
-                
-                # 对于其他格式，尝试PIL验证
-                return self._pil_quick_validation(file_path)
+            elif self._sniff_magic(file_path):
+                return True
+            
+            # 对于其他格式，尝试PIL验证
+            return self._pil_quick_validation(file_path, stat_result)
                 
         except Exception as e:
             logger.debug(f"快速验证失败 {file_path.name}: {e}")
             return False
     
-    def _pil_quick_validation(self, file_path: Path) -> bool:
+    def _sniff_magic(self, file_path: Path) -> Optional[str]:
+        """
+        通过文件头签名识别图像格式（只读取前12字节，不使用PIL）
+        
+        Args:
+            file_path: 图像文件路径
+        
+        Returns:
+            识别出的格式名称（如 'JPEG'），无法识别时返回None
+        
+        Raises:
+            OSError: 文件无法读取
+        """
+        # 直接使用文件描述符读取，不构造Python文件对象和缓冲区
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            header = os.read(fd, 12)
+        finally:
+            os.close(fd)
+        return self._match_magic(header)
+    
+    @staticmethod
+    def _match_magic(header: bytes) -> Optional[str]:
+        """
+        按文件头签名匹配图像格式
+        
+        Args:
+            header: 文件开头的字节（至少12字节）
+        
+        Returns:
+            识别出的格式名称，无法识别时返回None
+        """
+        candidates = _MAGIC_BY_PREFIX.get(header[:2])
+        if candidates is None:
+            return None
+        if header.startswith(b'RIFF'):
+            return 'WEBP' if header[8:12] == b'WEBP' else None
+        for signature, format_name in candidates:
+            if header.startswith(signature):
+                return format_name
+        return None
+    
+    def _pil_quick_validation(self, file_path: Path,
+                              stat_result: Optional[os.stat_result] = None) -> bool:
         """
         使用PIL进行快速验证
         
+        优先解析文件头尺寸；其余格式通过 _open_and_describe 打开文件，
+        提取的信息写入缓存，随后的 get_image_info 无需再次打开
+        
         Args:
             file_path: 图像文件路径
+            stat_result: 已获取的文件 stat 结果
         
         Returns:
             验证结果
         """
         try:
-            with Image.open(file_path) as img:
-                # 只获取基本信息，不加载像素数据
-                return img.width > 0 and img.height > 0
+            # 能直接解析文件头尺寸的格式无需构造PIL对象
+            dimensions = self._fast_dimensions(file_path)
+            if dimensions is not None:
+                return dimensions[0] > 0 and dimensions[1] > 0
+            
+            file_stat = stat_result if stat_result is not None else os.stat(file_path)
+            # 只获取基本信息，不加载像素数据
+            info = self._open_and_describe(file_path, file_stat, self.enable_exif, False)
+            return info.width > 0 and info.height > 0
         except Exception:
             return False
     
+    def scan(self, paths: Iterable[Path],
+             max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        批量快速检查图像文件（线程池并行读取文件头）
+        
+        每个文件只做一次 stat、一次 open 和一次32字节读取，
+        多个小读取在线程池中重叠执行以隐藏I/O延迟
+        
+        Args:
+            paths: 待检查的文件路径
+            max_workers: 线程数，默认 min(32, CPU数 * 4)
+        
+        Yields:
+            与输入顺序一致的结果字典，包含 file_path、file_size、modified_time、
+            is_valid、format、width、height（无法识别的字段为None）
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        window = max_workers * 4  # 限制在途任务数，避免一次性提交全部路径
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = deque()
+            for path in paths:
+                pending.append(pool.submit(self._scan_one, Path(path)))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def scan_batch(self, paths: Iterable[Path],
+                   max_workers: Optional[int] = None) -> "BatchResult":
+        """
+        批量检查文件并以列式结构返回结果
+        
+        数值列使用 array.array 连续存储，聚合（总大小、平均尺寸等）无需
+        遍历字典列表
+        
+        Args:
+            paths: 待检查的文件路径
+            max_workers: 线程数，默认同 scan
+        
+        Returns:
+            BatchResult，各列与输入顺序一致
+        """
+        batch = BatchResult()
+        for result in self.scan(paths, max_workers=max_workers):
+            batch.file_paths.append(result['file_path'])
+            batch.valid.append(result['is_valid'])
+            batch.widths.append(result['width'] or 0)
+            batch.heights.append(result['height'] or 0)
+            batch.size_bytes.append(result['file_size'] or 0)
+            batch.mtimes.append(result['modified_time'] or 0.0)
+        return batch
+    
+    def batch_validate(self, paths: Iterable[Path],
+                       max_workers: Optional[int] = None) -> List[bool]:
+        """
+        批量文件头校验（基于 scan 的线程池读取和签名表匹配）
+        
+        Args:
+            paths: 待检查的文件路径
+            max_workers: 线程数，默认同 scan
+        
+        Returns:
+            与输入顺序一致的布尔列表，文件头可识别为支持的图像格式时为True
+        """
+        return [result['is_valid'] for result in self.scan(paths, max_workers=max_workers)]
+    
+    def _scan_one(self, file_path: Path) -> Dict[str, Any]:
+        """
+        检查单个文件：扩展名、文件头签名和尺寸
+        
+        Args:
+            file_path: 图像文件路径
+        
+        Returns:
+            检查结果字典（见 scan）
+        """
+        result = {
+            'file_path': str(file_path),
+            'file_size': None,
+            'modified_time': None,
+            'is_valid': False,
+            'format': None,
+            'width': None,
+            'height': None,
+        }
+        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            return result
+        
+        try:
+            with open(file_path, 'rb') as f:
+                file_stat = os.fstat(f.fileno())
+                result['file_size'] = file_stat.st_size
+                result['modified_time'] = file_stat.st_mtime
+                if not S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
+                    return result
+                
+                header = f.read(32)
+                result['format'] = self._match_magic(header)
+                dimensions = self._parse_header_dims(header, f)
+        except (OSError, struct.error, ValueError) as e:
+            # 截断或损坏的文件头只影响该文件，作为无效结果返回
+            logger.debug("读取文件头失败 %s: %s", file_path.name, e)
+            return result
+        
+        if dimensions is not None:
+            result['width'], result['height'] = dimensions
+        result['is_valid'] = result['format'] is not None
+        return result
+    
     def get_supported_extensions(self) -> Set[str]:
         """
         获取支持的文件扩展名集合
@@ -339,7 +1002,7 @@ class ImageProcessor:
         Returns:
             支持的扩展名集合
         """
-        return SUPPORTED_EXTENSIONS.copy()
+        return set(SUPPORTED_EXTENSIONS)
     
     def get_image_dimensions(self, file_path: Path) -> Tuple[int, int]:
         """
@@ -355,12 +1018,117 @@ class ImageProcessor:
             ImageProcessorError: 无法获取尺寸
         """
         try:
-            with self._safe_image_open(file_path) as img:
+            # 常见格式直接解析文件头，无法识别时回退到PIL
+            dimensions = self._fast_dimensions(file_path)
+            if dimensions is not None:
+                return dimensions
+            
+            with Image.open(file_path) as img:
                 return img.size
         except Exception as e:
             logger.error(f"获取图像尺寸失败 {file_path.name}: {e}")
             raise ImageProcessorError(f"无法获取图像尺寸: {e}")
     
+    def _fast_dimensions(self, file_path: Path) -> Optional[Tuple[int, int]]:
+        """
+        直接从文件头解析图像尺寸（PNG/GIF/BMP/WebP/JPEG），不使用PIL
+        
+        Args:
+            file_path: 图像文件路径
+        
+        Returns:
+            (宽度, 高度) 元组，格式无法识别或文件头不完整时返回None
+        
+        Raises:
+            OSError: 文件无法读取
+        """
+        with open(file_path, 'rb') as f:
+            return self._parse_header_dims(f.read(32), f)
+    
+    @classmethod
+    def _parse_header_dims(cls, header: bytes, f) -> Optional[Tuple[int, int]]:
+        """
+        从文件头字节解析图像尺寸
+        
+        Args:
+            header: 文件开头的字节（至少32字节才能识别全部格式）
+            f: 以二进制模式打开的同一文件对象，JPEG需要继续扫描标记段
+        
+        Returns:
+            (宽度, 高度) 元组，格式无法识别或文件头不完整时返回None
+        """
+        if (header.startswith(b'\x89PNG\r\n\x1a\n') and header[12:16] == b'IHDR'
+                and len(header) >= 24):
+            return struct.unpack('>II', header[16:24])
+        
+        if header.startswith(b'GIF8') and len(header) >= 10:
+            return struct.unpack('<HH', header[6:10])
+        
+        if header.startswith(b'BM') and len(header) >= 26:
+            if struct.unpack('<I', header[14:18])[0] == 12:  # OS/2 BITMAPCOREHEADER
+                return struct.unpack('<HH', header[18:22])
+            width, height = struct.unpack('<ii', header[18:26])
+            return width, abs(height)  # 负高度表示自上而下存储
+        
+        if header.startswith(b'RIFF') and header[8:12] == b'WEBP' and len(header) >= 30:
+            chunk = header[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', header[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(header[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return (int.from_bytes(header[24:27], 'little') + 1,
+                        int.from_bytes(header[27:30], 'little') + 1)
+            return None
+        
+        if header.startswith(b'\xff\xd8'):
+            return cls._jpeg_dimensions(f)
+        
+        return None
+    
+    @staticmethod
+    def _jpeg_dimensions(f) -> Optional[Tuple[int, int]]:
+        """
+        逐段扫描JPEG标记，读取SOF段中的尺寸
+        
+        Args:
+            f: 以二进制模式打开的文件对象
+        
+        Returns:
+            (宽度, 高度) 元组，未找到SOF段时返回None
+        """
+        f.seek(2)
+        while True:
+            byte = f.read(1)
+            while byte == b'\xff':  # 跳过填充字节
+                byte = f.read(1)
+            if not byte:
+                return None
+            marker = byte[0]
+            
+            # 无长度字段的独立标记（TEM、RST0-7）
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                continue
+            if marker in (0xD9, 0xDA):  # EOI / SOS：SOF必须出现在图像数据之前
+                return None
+            
+            segment = f.read(2)
+            if len(segment) < 2:
+                return None
+            length = struct.unpack('>H', segment)[0]
+            
+            # SOF0-SOF15（排除DHT、JPG、DAC）
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                data = f.read(5)
+                if len(data) < 5:
+                    return None
+                height, width = struct.unpack('>HH', data[1:5])
+                return width, height
+            
+            f.seek(length - 2, os.SEEK_CUR)
+    
     def is_image_file(self, file_path: Path) -> bool:
         """
         检查文件是否为有效图像文件
@@ -370,43 +1138,54 @@ class ImageProcessor:
         
         Returns:
             如果是有效图像返回True，否则返回False
+        
+        Note:
+            只做扩展名检查和文件头签名匹配，不构造PIL图像对象；
+            需要解码级校验时请使用 validate_image
         """
-        if not file_path.exists() or not file_path.is_file():
+        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
             return False
         
-        if not self.is_supported_format(file_path.suffix):
+        try:
+            return self._sniff_magic(file_path) is not None
+        except OSError as e:
+            logger.debug(f"读取文件头失败 {file_path.name}: {e}")
             return False
-        
-        return self.validate_image(file_path, quick_check=True)
     
-    def get_file_info(self, file_path: Path, include_image_info: bool = True) -> Dict[str, Any]:
+    def get_file_info(self, file_path: Path, include_image_info: bool = True,
+                      stat_result: Optional[os.stat_result] = None) -> Dict[str, Any]:
         """
         获取综合文件和图像信息
         
         Args:
             file_path: 图像文件路径
             include_image_info: 是否包含详细图像信息
+            stat_result: 已获取的文件 stat 结果（如扫描时的 DirEntry.stat()），
+                提供时不再重复调用 stat
         
         Returns:
             包含文件和图像信息的字典
         """
         try:
             # 获取文件系统信息
-            stat = file_path.stat()
+            stat = stat_result if stat_result is not None else self._stat_once(file_path)
+            if stat is None:
+                raise FileNotFoundError(f"文件不存在: {file_path}")
+            suffix = file_path.suffix.lower()
             file_info = {
                 'filename': file_path.name,
                 'file_path': str(file_path),
                 'file_size': stat.st_size,
                 'modified_time': stat.st_mtime,
-                'extension': file_path.suffix.lower(),
-                'is_supported': self.is_supported_format(file_path.suffix)
+                'extension': suffix,
+                'is_supported': suffix in SUPPORTED_EXTENSIONS
             }
             
             # 添加图像信息（如果需要且是支持的格式）
             if include_image_info and file_info['is_supported']:
                 try:
-                    image_info = self.get_image_info(file_path)
-                    file_info.update(image_info)
+                    image_info = self.get_image_info(file_path, stat_result=stat)
+                    file_info.update(image_info.as_dict())
                     file_info['is_valid_image'] = True
                 except Exception as e:
                     logger.warning(f"无法提取图像信息 {file_path.name}: {e}")
@@ -443,7 +1222,8 @@ class ImageProcessor:
     
     def clear_cache(self):
         """清除所有缓存"""
-        self.is_supported_format.cache_clear()
+        with self._info_cache_lock:
+            self._info_cache.clear()
         logger.info("图像处理器缓存已清除")
     
     def reset_statistics(self):
@@ -465,7 +1245,7 @@ def get_supported_extensions() -> Set[str]:
     Returns:
         支持的扩展名集合
     """
-    return SUPPORTED_EXTENSIONS.copy()
+    return set(SUPPORTED_EXTENSIONS)
 
 def is_image_file(file_path: Path) -> bool:
     """
@@ -477,8 +1257,33 @@ def is_image_file(file_path: Path) -> bool:
     Returns:
         如果是支持的图像格式返回True，否则返回False
     """
-    processor = ImageProcessor()
-    return processor.is_image_file(file_path)
+    # 按文件名过滤：扩展名不支持时直接返回，不访问文件系统也不创建处理器
+    if os.path.splitext(file_path)[1].lower() not in SUPPORTED_EXTENSIONS:
+        return False
+    
+    # 复用模块级默认处理器，避免每次调用都构造新实例
+    return get_default_processor().is_image_file(Path(file_path))
+
+# 默认处理器实例（首次使用时创建，导入模块无副作用）
+_default_processor: Optional[ImageProcessor] = None
+_default_processor_lock = Lock()
+
+def get_default_processor() -> ImageProcessor:
+    """
+    获取模块级默认处理器（延迟初始化）
+    
+    Returns:
+        全局共享的 ImageProcessor 实例
+    """
+    global _default_processor
+    if _default_processor is None:
+        with _default_processor_lock:
+            if _default_processor is None:
+                _default_processor = ImageProcessor(cache_size=256, enable_exif=False)
+    return _default_processor
 
-# 创建默认处理器实例
-default_processor = ImageProcessor(cache_size=256, enable_exif=False)
\ No newline at end of file
+def __getattr__(name: str):
+    """兼容旧代码对 default_processor 的直接访问"""
+    if name == 'default_processor':
+        return get_default_processor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -6,23 +6,27 @@ Scans folders for image files, detects duplicates by hash, and manages file oper
 
 # Standard library imports
 import argparse
+import errno
 import logging
 import os
+import queue
 import signal
 import shutil
 import sys
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from threading import Lock
-from typing import Dict, Any, Optional, List, Union
+from stat import S_ISREG
+from threading import Thread, local
+from typing import Dict, Any, Iterator, Optional, List, Set, Tuple, Union
 
 # Third-party imports
 import coloredlogs
 from dotenv import load_dotenv
 
 # Local imports
-from database import db_manager, initialize_database
+from database import get_db_manager, initialize_database, close_database
 from file_monitor import FileScanner
 from image_processor import ImageProcessor, SUPPORTED_EXTENSIONS
 
@@ -32,6 +36,71 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# 无法用硬链接占用目标文件名时（跨文件系统、文件系统不支持硬链接等）改用占位文件
+_LINK_FALLBACK_ERRNOS = frozenset({errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP})
+
+# 实时处理的记录攒批写入数据库：达到条数或首条记录等待超过时间间隔即提交一次事务
+PENDING_FLUSH_SIZE = 256
+PENDING_FLUSH_INTERVAL = 2.0  # 秒
+# 待写入队列容量：写入跟不上时阻塞哈希线程，避免无限堆积
+RECORD_QUEUE_SIZE = 1024
+# 写入队列中的控制标记：立即提交当前批次
+_FLUSH = object()
+
+# _cached_now 的缓存：(刷新时的 monotonic 时间, UTC 时间)
+_now_cache: Tuple[float, Optional[datetime]] = (0.0, None)
+
+class _StatCounter:
+    """
+    按线程分片的统计计数器。
+    
+    每个线程只累加自己的槽位，递增无需加锁；读取时汇总所有槽位。
+    工作线程数有上限，槽位数量也随之有限。
+    """
+    
+    __slots__ = ('_local', '_slots')
+    
+    def __init__(self) -> None:
+        self._local = local()
+        self._slots: List[List[int]] = []
+    
+    def increment(self, amount: int = 1) -> None:
+        """为当前线程的槽位加上 amount"""
+        slot = getattr(self._local, 'slot', None)
+        if slot is None:
+            slot = self._local.slot = [0]
+            self._slots.append(slot)  # list.append 在 GIL 下是原子操作
+        slot[0] += amount
+    
+    @property
+    def value(self) -> int:
+        """所有线程的累计值"""
+        return sum(slot[0] for slot in self._slots)
+    
+    def __int__(self) -> int:
+        return self.value
+    
+    def __format__(self, format_spec: str) -> str:
+        return format(self.value, format_spec)
+    
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+def _stat_age(file_stat: os.stat_result) -> Tuple[int, int]:
+    """stat 结果的新旧顺序键（修改时间，状态变更时间）"""
+    return file_stat.st_mtime_ns, file_stat.st_ctime_ns
+
+def _new_stats(start_time: Optional[float] = None) -> Dict[str, Any]:
+    """创建一组新的处理统计（计数字段为 _StatCounter）"""
+    return {
+        'processed': _StatCounter(),
+        'duplicates': _StatCounter(),
+        'moved': _StatCounter(),
+        'skipped': _StatCounter(),
+        'errors': _StatCounter(),
+        'start_time': start_time
+    }
+
 class ImageDuplicateDetector:
     """
     主应用程序类，用于图片重复检测和文件管理。
@@ -42,10 +111,10 @@ class ImageDuplicateDetector:
     Attributes:
         config (Dict[str, Any]): 应用程序配置字典
         is_running (bool): 应用程序运行状态标志
-        processing_lock (Lock): 线程同步锁，用于保护统计数据
+        output_dir (Path): 输出目录路径（初始化时解析一次）
         image_processor (ImageProcessor): 图片处理器实例
         file_scanner (Optional[FileScanner]): 文件扫描器实例
-        stats (Dict[str, Union[int, float, None]]): 处理统计信息
+        stats (Dict[str, Any]): 处理统计信息，计数字段为无锁的 _StatCounter
     """
     
     def __init__(self, config: Dict[str, Any]) -> None:
@@ -57,20 +126,20 @@ class ImageDuplicateDetector:
         """
         self.config: Dict[str, Any] = config
         self.is_running: bool = False
-        self.processing_lock: Lock = Lock()
+        self.output_dir: Path = Path(config['output_dir'])
+        # 输出目录已占用文件名的快照，首次移动文件时读取
+        self._output_names: Optional[Set[str]] = None
+        # 待写入数据库的记录（源文件路径, 记录字典），由单独的写入线程攒批提交，
+        # 提交后再完成重复处理与移动；None 表示写入线程退出
+        self._record_queue: "queue.Queue[Any]" = queue.Queue(maxsize=RECORD_QUEUE_SIZE)
+        self._writer_thread: Optional[Thread] = None
         
         # Initialize components
         self.image_processor: ImageProcessor = ImageProcessor()
         self.file_scanner: Optional[FileScanner] = None
         
         # Statistics
-        self.stats: Dict[str, Union[int, float, None]] = {
-            'processed': 0,
-            'duplicates': 0,
-            'moved': 0,
-            'errors': 0,
-            'start_time': None
-        }
+        self.stats: Dict[str, Any] = _new_stats()
         
         logger.info("ImageDuplicateDetector initialized")
     
@@ -97,7 +166,7 @@ class ImageDuplicateDetector:
                 return False
             
             # Ensure output directory exists
-            output_dir = Path(self.config['output_dir'])
+            output_dir = self.output_dir
             try:
                 output_dir.mkdir(parents=True, exist_ok=True)
                 logger.info(f"输出目录已准备就绪: {output_dir.resolve()}")
@@ -111,11 +180,15 @@ class ImageDuplicateDetector:
                 self.file_scanner = FileScanner(
                     supported_extensions=SUPPORTED_EXTENSIONS,
                     file_processor_callback=self._process_file,
-                    scan_interval=scan_interval
+                    scan_interval=scan_interval,
+                    max_workers=self.config.get('max_workers'),
+                    use_watchdog=self.config.get('use_watchdog', False)
                 )
             except Exception as e:
                 logger.error(f"文件扫描器初始化失败: {e}")
                 return False
+            # 扫描器的工作线程会同时计算哈希，按线程数分配 BLAKE3 的单文件线程数
+            get_db_manager().set_hash_concurrency(self.file_scanner.max_workers)
             
             # Validate and add scan paths
             valid_paths_count = 0
@@ -133,6 +206,10 @@ class ImageDuplicateDetector:
                 logger.error("没有有效的扫描路径，应用程序无法启动")
                 return False
             
+            # 启动数据库写入线程（扫描器工作线程只负责验证与哈希）
+            self._writer_thread = Thread(target=self._writer_loop, name="db-writer", daemon=True)
+            self._writer_thread.start()
+            
             logger.info(f"应用程序初始化成功，共添加 {valid_paths_count} 个有效扫描路径")
             return True
             
@@ -141,7 +218,7 @@ class ImageDuplicateDetector:
             logger.exception("详细错误信息:")
             return False
     
-    def _process_file(self, file_path: Path) -> None:
+    def _process_file(self, file_path: Path, file_stat: Optional[os.stat_result] = None) -> None:
         """
         处理单个文件（由文件扫描器调用）。
         
@@ -150,63 +227,78 @@ class ImageDuplicateDetector:
         
         Args:
             file_path (Path): 图片文件的路径对象
+            file_stat (Optional[os.stat_result]): 扫描时获取的 stat 结果，
+                提供时跳过存在性检查（文件随后消失会以 FileNotFoundError 处理）；
+                未提供时调用一次 os.stat，后续验证与哈希复用该结果
             
         Note:
             此方法在后台线程中执行，应避免长时间阻塞操作
         """
         try:
-            # Check if file still exists and is accessible
-            if not file_path.exists():
-                logger.debug(f"文件已不存在: {file_path.name}")
-                return
-            
-            if not file_path.is_file():
-                logger.debug(f"路径不是文件: {file_path.name}")
-                return
-            
-            # Process the image file
-            success = self._process_image_file(file_path)
+            # 一次 stat 同时完成存在性、文件类型与大小检查
+            if file_stat is None:
+                try:
+                    file_stat = os.stat(file_path)
+                except FileNotFoundError:
+                    logger.debug("文件已不存在: %s", file_path.name)
+                    return
+                
+                if not S_ISREG(file_stat.st_mode):
+                    logger.debug("路径不是文件: %s", file_path.name)
+                    return
             
-            # Update stats under lock to avoid race conditions
-            with self.processing_lock:
-                if success:
-                    self.stats['processed'] += 1
-                else:
-                    self.stats['errors'] += 1
-                processed = self.stats['processed']
+            # Process the image file; 'processed' is counted by the writer thread
+            # once the file has been stored and moved
+            success = self._process_image_file(file_path, file_stat)
             
-            # Print progress every 10 files (read processed value outside lock)
-            if processed > 0 and processed % 10 == 0:
-                self._print_stats()
+            # Update stats (per-thread counters, no lock needed)
+            if not success:
+                self.stats['errors'].increment()
+                self._forget_file(file_stat)
+            # 统计信息由主循环定期打印，工作线程不写 stdout
                 
         except FileNotFoundError:
-            logger.debug(f"文件处理过程中文件消失: {file_path.name}")
+            logger.debug("文件处理过程中文件消失: %s", file_path.name)
+            self._forget_file(file_stat)
         except PermissionError:
             logger.warning(f"文件访问权限不足: {file_path.name}")
-            with self.processing_lock:
-                self.stats['errors'] += 1
+            self.stats['errors'].increment()
+            self._forget_file(file_stat)
         except Exception as e:
             logger.error(f"文件处理回调中发生错误: {e}")
             logger.exception(f"处理文件 {file_path.name} 时的详细错误:")
-            with self.processing_lock:
-                self.stats['errors'] += 1
+            self.stats['errors'].increment()
+            self._forget_file(file_stat)
+    
+    def _forget_file(self, file_stat: Optional[os.stat_result]) -> None:
+        """
+        让文件扫描器忘记该文件：失败的文件在下次扫描时重试，
+        已移动或删除的文件不再占用扫描器的已入队记录。
+        
+        Args:
+            file_stat (Optional[os.stat_result]): 文件入队时的 stat 结果
+        """
+        if file_stat is not None and self.file_scanner is not None:
+            self.file_scanner.forget(file_stat)
     
-    def _validate_file_format(self, file_path: Path) -> bool:
+    def _validate_file_format(self, file_path: Path, file_stat: Optional[os.stat_result] = None) -> bool:
         """
         验证文件格式和有效性。
         
         Args:
             file_path (Path): 文件路径
+            file_stat (Optional[os.stat_result]): 已获取的 stat 结果
             
         Returns:
             bool: 文件有效返回 True，否则返回 False
         """
-        if not self.image_processor.is_supported_format(file_path):
-            print(f"[跳过] 不支持的图片格式: {file_path.suffix}")
+        suffix = file_path.suffix.lower()
+        if suffix not in SUPPORTED_EXTENSIONS:
+            logger.debug("跳过不支持的图片格式: %s", suffix)
             return False
             
-        if not self.image_processor.validate_image(file_path):
-            print(f"[跳过] 非法或损坏的图片文件: {file_path.name}")
+        if not self.image_processor.validate_image(file_path, stat_result=file_stat):
+            logger.debug("跳过非法或损坏的图片文件: %s", file_path.name)
             return False
             
         return True
@@ -222,50 +314,205 @@ class ImageDuplicateDetector:
         Returns:
             bool: 处理成功返回 True，失败返回 False
         """
-        print(f"[重复] 发现重复文件: {file_path.name} (与 {existing_filename} 重复)")
+        logger.debug("发现重复文件: %s (与 %s 重复)", file_path.name, existing_filename)
         
         try:
             file_path.unlink()
-            print(f"[删除] 已删除重复文件: {file_path.name}")
+            logger.debug("已删除重复文件: %s", file_path.name)
             
-            with self.processing_lock:
-                self.stats['duplicates'] += 1
+            self.stats['duplicates'].increment()
             
             return True
             
         except Exception as e:
-            print(f"[错误] 删除重复文件失败 {file_path.name}: {e}")
             logger.error(f"删除重复文件失败 - 文件: {file_path.name}, 错误: {e}")
             return False
     
-    def _save_file_to_database(self, file_path: Path, file_size: int, file_hash: str) -> bool:
+    def _queue_record(self, file_path: Path, file_stat: os.stat_result, file_hash: str) -> None:
         """
-        保存文件信息到数据库。
+        将文件记录交给数据库写入线程。
+        
+        队列已满时阻塞，直到写入线程追上。
         
         Args:
             file_path (Path): 文件路径
-            file_size (int): 文件大小
+            file_stat (os.stat_result): 文件的 stat 结果（大小，以及处理完成后通知扫描器）
             file_hash (str): 文件哈希值
+        """
+        name = file_path.name
+        self._record_queue.put((file_path, file_stat, {
+            'hash': file_hash,
+            'original_name': name,
+            'source_path': str(file_path),
+            'file_size': file_stat.st_size,
+            'extension': os.path.splitext(name)[1].lower(),
+            'created_at': _cached_now(),
+        }))
+    
+    def _writer_loop(self) -> None:
+        """
+        数据库写入线程主循环。
+        
+        从队列中收集文件记录，达到 PENDING_FLUSH_SIZE 条或首条记录等待超过
+        PENDING_FLUSH_INTERVAL 秒时批量提交；收到 _FLUSH 标记立即提交，
+        收到 None 时提交剩余记录后退出。
+        
+        等待期间同一文件（按 st_dev, st_ino）再次入队时只保留 stat 最新的一条，
+        正在写入的文件不会以多个中间状态分别入库。
+        """
+        record_queue = self._record_queue
+        pending: Dict[Tuple[int, int], Tuple[Path, os.stat_result, Dict[str, Any]]] = {}
+        deadline = 0.0
+        while True:
+            try:
+                item = record_queue.get(timeout=max(deadline - time.monotonic(), 0) if pending else None)
+            except queue.Empty:
+                # 首条记录等待超时
+                self._write_batch(list(pending.values()))
+                pending = {}
+                continue
             
-        Returns:
-            bool: 保存成功返回 True，失败返回 False
+            if item is not None and item is not _FLUSH:
+                if not pending:
+                    deadline = time.monotonic() + PENDING_FLUSH_INTERVAL
+                file_stat = item[1]
+                key = (file_stat.st_dev, file_stat.st_ino)
+                queued = pending.get(key)
+                if queued is not None:
+                    # 哈希线程可能乱序完成，按 stat 时间保留较新的一条
+                    if _stat_age(queued[1]) > _stat_age(file_stat):
+                        item = queued
+                    record_queue.task_done()
+                pending[key] = item
+                if len(pending) < PENDING_FLUSH_SIZE:
+                    continue
+            
+            self._write_batch(list(pending.values()))
+            pending = {}
+            if item is None or item is _FLUSH:
+                record_queue.task_done()
+            if item is None:
+                return
+    
+    def _write_batch(self, batch: List[Tuple[Path, os.stat_result, Dict[str, Any]]]) -> None:
+        """
+        在一个事务中写入一批文件记录，并完成重复文件删除与新文件移动。
+        
+        入库前重新 stat，哈希计算后又变化的文件不写入（见 _drop_changed_files）。
+        哈希冲突即视为重复。该方法不抛出异常，失败计入错误统计；
+        已移动或删除的文件，以及入库前失败的文件，会从扫描器的已入队记录中移除。
+        
+        Args:
+            batch (List[Tuple[Path, os.stat_result, Dict[str, Any]]]): (源文件路径, stat 结果, 记录字典) 列表
         """
+        if not batch:
+            return
         try:
-            _ = db_manager.add_file_record(
-                original_name=file_path.name,
-                source_path=str(file_path),
-                file_size=file_size,
-                file_hash=file_hash,
-                extension=file_path.suffix.lower(),
-                created_at=datetime.utcnow()
-            )
-            print(f"[数据库] 已保存文件信息到数据库: {file_path.name}")
-            return True
-        except Exception as e:
-            print(f"[错误] 保存文件信息到数据库失败 {file_path.name}: {e}")
-            logger.error(f"数据库操作失败 - 文件: {file_path.name}, 错误: {e}")
-            logger.exception("数据库操作详细错误:")
-            return False
+            unchanged = self._drop_changed_files(batch)
+            if not unchanged:
+                return
+            try:
+                existing_names = get_db_manager().add_file_records_or_get_duplicates(
+                    [record for _, _, record in unchanged]
+                )
+            except Exception as e:
+                logger.error(f"数据库操作失败 - {len(unchanged)} 个文件, 错误: {e}")
+                logger.exception("数据库操作详细错误:")
+                self.stats['errors'].increment(len(unchanged))
+                for _, file_stat, _ in unchanged:
+                    self._forget_file(file_stat)
+                return
+            
+            for (file_path, file_stat, _), existing_filename in zip(unchanged, existing_names):
+                try:
+                    if existing_filename:
+                        success = self._handle_duplicate_file(file_path, existing_filename)
+                    else:
+                        logger.debug("已保存文件信息到数据库: %s", file_path.name)
+                        success = self._store_new_file(file_path)
+                        if success:
+                            self.stats['processed'].increment()
+                except Exception as e:
+                    logger.error(f"处理已入库文件失败 - 文件: {file_path.name}, 错误: {e}")
+                    success = False
+                if not success:
+                    self.stats['errors'].increment()
+                    if not existing_filename:
+                        # 记录已入库但移动失败：重试会把它当作自身的重复文件删除，保持已入队状态
+                        continue
+                # 成功时文件已离开扫描目录；删除重复文件失败时下次扫描重试
+                self._forget_file(file_stat)
+        finally:
+            for _ in batch:
+                self._record_queue.task_done()
+    
+    def _drop_changed_files(self, batch: List[Tuple[Path, os.stat_result, Dict[str, Any]]]
+                            ) -> List[Tuple[Path, os.stat_result, Dict[str, Any]]]:
+        """
+        入库前重新 stat，去掉哈希计算后又被修改或已消失的文件。
+        
+        这些记录的哈希对应的是文件的中间状态；文件从扫描器的已入队记录中移除，
+        写入完成后的下一次扫描或事件会以最终内容重新入队。
+        
+        Args:
+            batch (List[Tuple[Path, os.stat_result, Dict[str, Any]]]): 待写入的记录
+            
+        Returns:
+            List[Tuple[Path, os.stat_result, Dict[str, Any]]]: 自入队以来未变化的记录
+        """
+        unchanged = []
+        for item in batch:
+            file_path, file_stat, _ = item
+            try:
+                current = os.stat(file_path)
+            except FileNotFoundError:
+                current = None
+            if (current is None or current.st_mtime_ns != file_stat.st_mtime_ns
+                    or current.st_size != file_stat.st_size):
+                logger.debug("文件在入库前发生变化，等待重新扫描: %s", file_path.name)
+                self._forget_file(file_stat)
+                continue
+            unchanged.append(item)
+        return unchanged
+    
+    def flush_pending_records(self) -> None:
+        """
+        立即提交已入队的文件记录，并等待删除与移动完成。
+        """
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            return
+        self._record_queue.put(_FLUSH)
+        self._record_queue.join()
+    
+    def _stop_writer(self) -> None:
+        """提交剩余记录并停止数据库写入线程"""
+        if self._writer_thread is None:
+            return
+        if self._writer_thread.is_alive():
+            self._record_queue.put(None)
+            self._writer_thread.join()
+        self._writer_thread = None
+    
+    def _store_new_file(self, file_path: Path) -> bool:
+        """
+        记录已写入数据库的新文件信息并移动到输出目录。
+        
+        Args:
+            file_path (Path): 源文件路径
+            
+        Returns:
+            bool: 移动成功返回 True，失败返回 False
+        """
+        # 获取图片信息仅用于调试日志，非 DEBUG 级别时不打开图片
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                image_info = self.image_processor.get_image_info(file_path)
+                logger.debug("图片尺寸: %dx%d, 格式: %s", image_info.width, image_info.height, image_info.format)
+            except Exception as e:
+                logger.debug("无法获取图片信息 %s: %s", file_path.name, e)
+        
+        # 移动文件到输出目录
+        return self._move_file_to_output(file_path)
     
     def _move_file_to_output(self, file_path: Path) -> bool:
         """
@@ -277,95 +524,155 @@ class ImageDuplicateDetector:
         Returns:
             bool: 移动成功返回 True，失败返回 False
         """
-        output_dir = Path(self.config['output_dir'])
-        output_path = output_dir / file_path.name
-        
-        # Ensure unique output filename
-        counter = 1
-        while output_path.exists():
-            stem = file_path.stem
-            suffix = file_path.suffix
-            output_path = output_dir / f"{stem}_{counter}{suffix}"
-            counter += 1
+        output_dir = self.output_dir
+        name = file_path.name
+        output_path = output_dir / name
         
         try:
-            shutil.move(str(file_path), str(output_path))
-            print(f"[移动] 文件已移动到: {output_path}")
+            # 快照中已占用的文件名直接跳过，无需逐个尝试系统调用；
+            # 目标文件名仍通过 os.link / O_EXCL 原子占用，快照过期也不会覆盖已有文件，无需加锁
+            taken = self._get_output_names()
+            use_link = True
+            candidate = name
+            counter = 1
+            while True:
+                if candidate not in taken:
+                    output_path = output_dir / candidate
+                    try:
+                        if use_link:
+                            self._link_then_unlink(file_path, output_path)
+                        else:
+                            self._reserve_then_replace(file_path, output_path)
+                        break
+                    except FileExistsError:
+                        taken.add(candidate)
+                    except OSError as e:
+                        if not use_link or e.errno not in _LINK_FALLBACK_ERRNOS:
+                            raise
+                        use_link = False
+                        continue
+                stem, suffix = os.path.splitext(name)
+                candidate = f"{stem}_{counter}{suffix}"
+                counter += 1
+            taken.add(candidate)
+            logger.debug("文件已移动到: %s", output_path)
             
-            with self.processing_lock:
-                self.stats['moved'] += 1
+            self.stats['moved'].increment()
             
             return True
             
         except (OSError, PermissionError) as e:
-            print(f"[错误] 移动文件失败 {file_path.name}: {e}")
             logger.error(f"文件移动失败 - 源: {file_path}, 目标: {output_path}, 错误: {e}")
             return False
         except Exception as e:
-                print(f"[错误] 移动文件时发生未预期错误 {file_path.name}: {e}")
-                logger.error(f"文件移动过程中的未预期错误: {e}")
-                logger.exception("文件移动详细错误:")
-                return False
+            logger.error(f"文件移动过程中的未预期错误 - 文件: {name}, 错误: {e}")
+            logger.exception("文件移动详细错误:")
+            return False
+    
+    def _get_output_names(self) -> Set[str]:
+        """
+        获取输出目录中已占用文件名的快照（首次调用时读取一次目录）。
+        
+        Returns:
+            Set[str]: 已占用的输出文件名集合，移动成功后由调用方更新
+        """
+        if self._output_names is None:
+            try:
+                self._output_names = set(os.listdir(self.output_dir))
+            except FileNotFoundError:
+                self._output_names = set()
+        return self._output_names
+    
+    @staticmethod
+    def _link_then_unlink(file_path: Path, output_path: Path) -> None:
+        """
+        同一文件系统内移动文件：硬链接到目标路径后删除源文件。
+        
+        Args:
+            file_path (Path): 源文件路径
+            output_path (Path): 目标文件路径
+            
+        Raises:
+            FileExistsError: 目标文件名已被占用
+            OSError: 无法创建硬链接或删除源文件
+        """
+        os.link(file_path, output_path)
+        try:
+            os.unlink(file_path)
+        except OSError:
+            os.unlink(output_path)
+            raise
+    
+    @staticmethod
+    def _reserve_then_replace(file_path: Path, output_path: Path) -> None:
+        """
+        以 O_EXCL 创建占位文件占用目标文件名，再用 os.replace 覆盖；
+        跨文件系统时回退到 shutil.move（复制后删除）。
+        
+        Args:
+            file_path (Path): 源文件路径
+            output_path (Path): 目标文件路径
+            
+        Raises:
+            FileExistsError: 目标文件名已被占用
+            OSError: 移动失败
+        """
+        os.close(os.open(output_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        try:
+            try:
+                os.replace(file_path, output_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(str(file_path), str(output_path))
+        except OSError:
+            output_path.unlink(missing_ok=True)
+            raise
     
-    def _process_image_file(self, file_path: Path) -> bool:
+    def _process_image_file(self, file_path: Path, file_stat: os.stat_result) -> bool:
         """
         处理单个图片文件，包含重复检测功能。
         
         执行完整的图片处理流程：
         1. 快速验证文件与图片格式
-        2. 计算文件哈希并检查重复
-        3. 记录文件元数据到数据库
-        4. 移动文件到输出目录
+        2. 计算文件哈希
+        3. 将文件记录加入待写入批次
+        4. 批次提交后：哈希冲突即视为重复并删除，新文件移动到输出目录
         
         Args:
             file_path (Path): 图片文件的路径对象
+            file_stat (os.stat_result): 已获取的 stat 结果，验证与哈希不再重复调用 stat
         
         Returns:
-            bool: 处理成功返回 True，失败返回 False
+            bool: 记录已入队或文件被跳过返回 True，失败返回 False
             
         Note:
-            对于重复文件，会自动删除并更新统计信息
+            重复文件的删除与新文件的移动由数据库写入线程在批次提交后完成，
+            失败计入错误统计
         """
         try:
-            print(f"[处理] 正在处理文件: {file_path.name}")
+            logger.debug("正在处理文件: %s", file_path.name)
             
             # 验证文件格式和有效性
-            if not self._validate_file_format(file_path):
+            if not self._validate_file_format(file_path, file_stat):
+                self.stats['skipped'].increment()
                 return True  # 非错误，仅跳过
             
-            # 获取文件大小
-            file_size = file_path.stat().st_size
-            
-
-            file_hash = db_manager.calculate_file_hash(file_path)
-            # 计算文件哈希
-            print(f"[计算] 计算文件hash: {file_hash}")
-            # 检查重复文件
-            existing_filename = db_manager.check_duplicate(file_hash)
-            if existing_filename:
-                return self._handle_duplicate_file(file_path, existing_filename)
-            
-            # 获取图片信息（可选，用于日志）
-            try:
-                image_info = self.image_processor.get_image_info(file_path)
-                print(f"[信息] 图片尺寸: {image_info.get('width', 'N/A')}x{image_info.get('height', 'N/A')}, 格式: {image_info.get('format', 'N/A')}")
-            except Exception as e:
-                print(f"[警告] 无法获取图片信息: {e}")
-            
-            # 保存到数据库
-            if not self._save_file_to_database(file_path, file_size, file_hash):
-                return False
+            # 计算文件哈希（文件大小取自已有的 stat 结果）
+            file_hash = get_db_manager().calculate_file_hash(file_path, file_size=file_stat.st_size)
+            logger.debug("文件hash: %s -> %s", file_path.name, file_hash)
             
-            # 移动文件到输出目录
-            return self._move_file_to_output(file_path)
+            # 加入待写入批次（INSERT ... ON CONFLICT DO NOTHING 批量提交时完成重复检测）
+            self._queue_record(file_path, file_stat, file_hash)
+            return True
             
         except Exception as e:
-            print(f"[错误] 处理文件失败 {file_path.name}: {e}")
             logger.error(f"处理图片文件失败 - 文件: {file_path.name}, 错误: {e}")
             logger.exception("处理图片文件详细错误:")
             return False
     
-    def batch_process_folder(self, folder_path: str, recursive: bool = True, batch_size: int = 100) -> Dict[str, int]:
+    def batch_process_folder(self, folder_path: str, recursive: bool = True, batch_size: int = 100,
+                             show_progress: bool = False) -> Dict[str, int]:
         """
         批量处理文件夹中的所有图片文件（优化版本）。
         
@@ -376,6 +683,8 @@ class ImageDuplicateDetector:
             folder_path (str): 要处理的文件夹路径
             recursive (bool, optional): 是否递归处理子文件夹，默认为 True
             batch_size (int, optional): 批量处理大小，默认为 100
+            show_progress (bool, optional): 是否预先统计文件总数以显示完成进度，
+                需要额外遍历一次目录，默认为 False
             
         Returns:
             Dict[str, int]: 处理结果统计字典，包含以下键值：
@@ -408,109 +717,172 @@ class ImageDuplicateDetector:
         print("========================\n")
         
         try:
-            # 使用生成器优化内存使用，避免一次性加载所有文件
-            def get_image_files():
-                """生成器函数，逐个返回图片文件路径"""
-                pattern = '**/*' if recursive else '*'
-                for ext in SUPPORTED_EXTENSIONS:
-                    # 支持大小写不敏感的扩展名匹配
-                    yield from folder.glob(f"{pattern}{ext}")
-                    yield from folder.glob(f"{pattern}{ext.upper()}")
-            
-            # 预先统计文件数量用于进度显示
-            all_files = list(get_image_files())
-            total_files = len(all_files)
-            print(f"[扫描] 找到 {total_files} 个图片文件")
-            
-            if total_files == 0:
-                print("[完成] 未找到任何图片文件")
-                return batch_stats
-            
             # 批量处理文件，减少数据库连接开销
             processed_count = 0
+            scanned_count = 0
+            # 仅在需要显示完成进度时额外遍历一次目录统计总数
+            total_count = sum(1 for _ in iter_images(folder, recursive)) if show_progress else 0
+            progress_total = f"/{total_count}" if show_progress else ""
             start_time = time.time()
+            candidates: List[tuple] = []
+            db_manager = get_db_manager()
+            # 大小不同的文件不可能重复：预加载已知文件大小，只对大小冲突的文件查重；
+            # 再用哈希 Bloom 过滤器排除大小相同但内容不同的文件，只有疑似重复才查询数据库
+            # （记录过多时不构建过滤器，大小冲突的文件全部查询数据库）
+            known_sizes = db_manager.get_known_sizes()
+            known_hashes = db_manager.build_hash_filter()
+            hash_workers = os.cpu_count() or 1
+            hash_pool = ThreadPoolExecutor(max_workers=hash_workers)
+            # 批量模式结束后恢复实时模式使用的单文件哈希线程数
+            previous_hash_threads = db_manager.hash_max_threads
+            db_manager.set_hash_concurrency(hash_workers)
+            pending_records: List[Dict[str, Any]] = []
+            pending_hashes = set()
             
-            for i, file_path in enumerate(all_files, 1):
+            def flush_pending() -> None:
+                """将累积的记录批量写入数据库"""
+                if not pending_records:
+                    return
                 try:
-                    # 显示进度（每处理10个文件或最后一个文件时显示）
-                    if i % 10 == 0 or i == total_files:
-                        elapsed = time.time() - start_time
-                        rate = i / elapsed if elapsed > 0 else 0
-                        print(f"[进度] {i}/{total_files} ({i/total_files*100:.1f}%) - 处理速度: {rate:.1f} 文件/秒")
-                    
-                    # 快速预检查：文件大小和扩展名
-                    if not self.image_processor.is_supported_format(file_path):
-                        batch_stats['skipped'] += 1
-                        continue
-                    
-                    # 获取文件基本信息
-                    try:
-                        file_stat = file_path.stat()
-                        file_size = file_stat.st_size
-                        
-                        # 跳过空文件
-                        if file_size == 0:
-                            logger.debug(f"跳过空文件: {file_path.name}")
-                            batch_stats['skipped'] += 1
-                            continue
-                            
-                    except OSError as e:
-                        logger.warning(f"无法获取文件信息 {file_path.name}: {e}")
+                    inserted = db_manager.bulk_copy_file_records(pending_records, session=session)
+                    session.commit()
+                    print(f"[数据库] 已批量保存 {inserted} 条文件信息到数据库")
+                    batch_stats['processed'] += inserted
+                    # 写入时因哈希冲突被跳过的记录视为重复文件
+                    batch_stats['duplicates'] += len(pending_records) - inserted
+                except Exception as e:
+                    session.rollback()
+                    print(f"[错误] 批量保存到数据库失败: {e}")
+                    logger.error(f"Failed to add {len(pending_records)} file records: {e}")
+                    batch_stats['errors'] += len(pending_records)
+                pending_records.clear()
+                pending_hashes.clear()
+            
+            def precheck_and_hash(candidate):
+                """在工作线程中计算哈希并验证图像（数据库读写仍只在主线程进行）"""
+                file_path, file_size = candidate
+                try:
+                    # 哈希与文件头在同一次读取中得到，魔数校验无需再次打开文件
+                    file_hash, header = db_manager.hash_file_with_header(file_path, file_size=file_size)
+                    if not self.image_processor.validate_image(file_path, header=header):
+                        return None, None
+                    return file_hash, None
+                except Exception as e:
+                    return None, e
+            
+            def process_candidates() -> None:
+                """验证一组候选文件并计算哈希，再用一次查询完成重复检测"""
+                # 验证和哈希在线程池中并行（文件读取和哈希计算会释放 GIL），
+                # 结果按提交顺序在主线程汇总，统计无需加锁
+                hashed = []
+                for (file_path, file_size), (file_hash, error) in zip(
+                        candidates, hash_pool.map(precheck_and_hash, candidates)):
+                    if error is not None:
+                        print(f"[错误] 计算文件哈希失败: {error}")
+                        logger.error(f"Failed to hash file {file_path.name}: {error}")
                         batch_stats['errors'] += 1
                         continue
-                    
-                    # 验证图像有效性（使用优化的验证方法）
-                    if not self.image_processor.validate_image(file_path):
-                        logger.debug(f"跳过无效图像: {file_path.name}")
+                    if file_hash is None:
+                        logger.debug("跳过无效图像: %s", file_path.name)
                         batch_stats['skipped'] += 1
                         continue
-                    
-                    # 计算文件hash（使用优化的哈希计算）
-                    file_hash = db_manager.calculate_file_hash(file_path)
-                    
-                    # 检查重复（使用优化的查询）
-                    existing_filename = db_manager.check_duplicate(file_hash)
+                    hashed.append((file_path, file_size, file_hash))
+                candidates.clear()
+                if not hashed:
+                    return
+                
+                # 检查重复（一次批量查询，同时检查尚未写入的待插入记录）
+                try:
+                    existing = db_manager.check_duplicates_bulk([
+                        file_hash for _, file_size, file_hash in hashed
+                        if file_size in known_sizes
+                        and (known_hashes is None or file_hash in known_hashes)
+                    ], session=session)
+                except Exception as e:
+                    session.rollback()
+                    print(f"[错误] 批量检查重复失败: {e}")
+                    logger.error(f"Failed to check {len(hashed)} hashes for duplicates: {e}")
+                    batch_stats['errors'] += len(hashed)
+                    return
+                
+                # 同一批次的记录共用一个创建时间，不再逐条获取当前时间
+                created_at = _cached_now()
+                for file_path, file_size, file_hash in hashed:
+                    name = file_path.name
+                    if file_hash in pending_hashes:
+                        logger.debug("发现重复文件: %s (与本批次待插入文件重复)", name)
+                        batch_stats['duplicates'] += 1
+                        continue
+                    existing_filename = existing.get(file_hash)
                     if existing_filename:
-                        print(f"[重复] 发现重复文件 (与 {existing_filename} 重复)")
+                        logger.debug("发现重复文件: %s (与 %s 重复)", name, existing_filename)
                         batch_stats['duplicates'] += 1
                         continue
                     
-                    # 插入数据库
-                    try:
-                        from datetime import datetime
-                        _ = db_manager.add_file_record(
-                            original_name=file_path.name,
-                            source_path=str(file_path),
-                            file_size=file_size,
-                            file_hash=file_hash,
-                            extension=file_path.suffix.lower(),
-                            created_at=datetime.utcnow()
-                        )
-                        print(f"[数据库] 已保存文件信息到数据库")
-                        batch_stats['processed'] += 1
-                        
-                    except Exception as e:
-                        print(f"[错误] 保存到数据库失败: {e}")
-                        logger.error(f"Failed to add image metadata for {file_path.name}: {e}")
-                        batch_stats['errors'] += 1
-                        
-                except Exception as e:
-                    print(f"[错误] 处理文件失败: {e}")
-                    logger.error(f"Failed to process file {file_path.name}: {e}")
-                    batch_stats['errors'] += 1
-                
-                # 每处理10个文件打印一次进度
-                if i % 10 == 0:
-                    print(f"\n--- 进度报告 ({i}/{total_files}) ---")
-                    print(f"已处理: {batch_stats['processed']}")
-                    print(f"重复: {batch_stats['duplicates']}")
-                    print(f"跳过: {batch_stats['skipped']}")
-                    print(f"错误: {batch_stats['errors']}")
-                    print("---------------------------\n")
+                    # 累积待插入记录，每 batch_size 条用一条多行 INSERT 写入并提交一次事务
+                    pending_records.append({
+                        'hash': file_hash,
+                        'original_name': name,
+                        'source_path': str(file_path),
+                        'file_size': file_size,
+                        'extension': os.path.splitext(name)[1].lower(),
+                        'created_at': created_at,
+                    })
+                    pending_hashes.add(file_hash)
+                    known_sizes.add(file_size)
+                    if known_hashes is not None:
+                        known_hashes.add(file_hash)
+                    if len(pending_records) >= batch_size:
+                        flush_pending()
+            
+            try:
+                # 整个批量处理复用一个会话，每批写入后提交一次事务
+                with db_manager.batch_session() as session:
+                    # 边扫描边处理：目录遍历与哈希计算流水线执行，无需先收集完整文件列表
+                    for i, (file_path, file_size) in enumerate(iter_images(folder, recursive), 1):
+                        scanned_count = i
+                        try:
+                            # 显示进度与统计（每处理10个文件时单次写入，逐文件的详细信息走 logger.debug）
+                            if i % 10 == 0:
+                                elapsed = time.time() - start_time
+                                rate = i / elapsed if elapsed > 0 else 0
+                                sys.stdout.write(
+                                    f"[进度] 已扫描 {i}{progress_total} 个文件 - 处理速度: {rate:.1f} 文件/秒 "
+                                    f"(已处理: {batch_stats['processed']}, 重复: {batch_stats['duplicates']}, "
+                                    f"跳过: {batch_stats['skipped']}, 错误: {batch_stats['errors']})\n"
+                                )
+                                sys.stdout.flush()
+                            
+                            # 扩展名已在 iter_images 中筛选；跳过空文件（大小来自目录扫描，无需再次 stat）
+                            if file_size == 0:
+                                logger.debug("跳过空文件: %s", file_path.name)
+                                batch_stats['skipped'] += 1
+                                continue
+                            
+                            # 累积候选文件，每 batch_size 个统一验证、计算哈希并批量查重
+                            candidates.append((file_path, file_size))
+                            if len(candidates) >= batch_size:
+                                process_candidates()
+                                
+                        except Exception as e:
+                            print(f"[错误] 处理文件失败: {e}")
+                            logger.error(f"Failed to process file {file_path.name}: {e}")
+                            batch_stats['errors'] += 1
+                    
+                    # 处理剩余的候选文件并写入剩余的待插入记录
+                    process_candidates()
+                    flush_pending()
+            finally:
+                hash_pool.shutdown(wait=True)
+                db_manager.hash_max_threads = previous_hash_threads
+            
+            if scanned_count == 0:
+                print("[完成] 未找到任何图片文件")
+                return batch_stats
             
             # 打印最终统计
             print(f"\n=== 批量处理完成 ===")
-            print(f"总文件数: {total_files}")
+            print(f"总文件数: {scanned_count}")
             print(f"成功处理: {batch_stats['processed']}")
             print(f"重复文件: {batch_stats['duplicates']}")
             print(f"跳过文件: {batch_stats['skipped']}")
@@ -528,24 +900,26 @@ class ImageDuplicateDetector:
         """
         打印当前处理统计信息。
         
-        显示已处理文件数、重复文件数、移动文件数、错误数、
+        显示已处理文件数、重复文件数、移动文件数、跳过数、错误数、
         队列中待处理文件数以及运行时间等统计信息。
         
         Note:
-            使用线程锁确保统计数据的一致性
+            计数器无锁读取；只由主线程调用，整块内容一次写出
         """
-        with self.processing_lock:
-            elapsed = time.time() - self.stats['start_time'] if self.stats['start_time'] else 0
-            queue_size = self.file_scanner.get_queue_size() if self.file_scanner else 0
-            
-            print(f"\n=== 处理统计 ===")
-            print(f"已处理: {self.stats['processed']} 个文件")
-            print(f"重复文件: {self.stats['duplicates']} 个")
-            print(f"已移动: {self.stats['moved']} 个")
-            print(f"错误: {self.stats['errors']} 个")
-            print(f"队列中: {queue_size} 个文件")
-            print(f"运行时间: {elapsed:.1f} 秒")
-            print(f"================\n")
+        elapsed = time.time() - self.stats['start_time'] if self.stats['start_time'] else 0
+        queue_size = self.file_scanner.get_queue_size() if self.file_scanner else 0
+        
+        print(
+            f"\n=== 处理统计 ===\n"
+            f"已处理: {self.stats['processed']} 个文件\n"
+            f"重复文件: {self.stats['duplicates']} 个\n"
+            f"已移动: {self.stats['moved']} 个\n"
+            f"跳过: {self.stats['skipped']} 个\n"
+            f"错误: {self.stats['errors']} 个\n"
+            f"队列中: {queue_size} 个文件\n"
+            f"运行时间: {elapsed:.1f} 秒\n"
+            f"================\n"
+        )
     
     def start(self) -> None:
         """
@@ -571,13 +945,7 @@ class ImageDuplicateDetector:
             print("========================\n")
             
             # Reset statistics
-            self.stats = {
-                'processed': 0,
-                'duplicates': 0,
-                'moved': 0,
-                'errors': 0,
-                'start_time': time.time()
-            }
+            self.stats = _new_stats(time.time())
             
             # Start file scanner
             if not self.file_scanner.start():
@@ -629,7 +997,8 @@ class ImageDuplicateDetector:
         if not self.is_running:
             # 即使当前状态为未运行，也尝试关闭数据库连接以确保资源释放
             try:
-                db_manager.close()
+                self._stop_writer()
+                close_database()
             except Exception:
                 pass
             return
@@ -644,13 +1013,16 @@ class ImageDuplicateDetector:
             if self.file_scanner:
                 self.file_scanner.stop()
             
+            # 提交剩余的待写入记录并停止写入线程
+            self._stop_writer()
+            
             # 打印最终统计快照
             print("\n=== 最终统计 ===")
             self._print_stats()
             
             # 确保数据库连接被正确释放，避免连接泄漏
             try:
-                db_manager.close()
+                close_database()
             except Exception as e:
                 logger.warning(f"Failed to close database cleanly: {e}")
             
@@ -659,6 +1031,59 @@ class ImageDuplicateDetector:
         except Exception as e:
             logger.error(f"Error stopping application: {e}")
 
+def iter_images(root: Union[str, Path], recursive: bool = True) -> Iterator[Tuple[Path, int]]:
+    """
+    流式遍历目录中的图片文件。
+    
+    使用 os.scandir 逐层遍历目录，按扩展名（不区分大小写）筛选图片，
+    逐个产出 (路径, 文件大小)，不会预先构建完整的文件列表。
+    文件大小取自 DirEntry.stat()，Windows 上无需额外系统调用。
+    
+    Args:
+        root (Union[str, Path]): 要遍历的根目录
+        recursive (bool, optional): 是否递归遍历子目录，默认为 True
+        
+    Yields:
+        Tuple[Path, int]: 图片文件路径及其大小（字节）
+    """
+    pending_dirs = [os.fspath(root)]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending_dirs.append(entry.path)
+                        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                            yield Path(entry.path), entry.stat().st_size
+                    except OSError as e:
+                        logger.warning(f"无法读取文件信息 {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"无法扫描目录 {current_dir}: {e}")
+
+def _cached_now(resolution: float = 1.0) -> datetime:
+    """
+    获取缓存的当前 UTC 时间。
+    
+    created_at 只是入库时间戳，秒级精度即可；缓存值每 resolution 秒
+    刷新一次，避免逐个文件调用 datetime.now()。
+    
+    Args:
+        resolution (float, optional): 缓存刷新间隔（秒），默认为 1.0
+        
+    Returns:
+        datetime: 当前 UTC 时间（误差不超过 resolution 秒）
+    """
+    global _now_cache
+    checked_at, now = _now_cache
+    current = time.monotonic()
+    if now is None or current - checked_at >= resolution:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        _now_cache = (current, now)
+    return now
+
 def load_config() -> Dict[str, Any]:
     """
     从环境变量加载应用程序配置。
@@ -671,6 +1096,8 @@ def load_config() -> Dict[str, Any]:
             - scan_paths: 扫描路径列表
             - output_dir: 输出目录路径
             - scan_interval: 扫描间隔（秒）
+            - max_workers: 并发处理文件的工作线程数
+            - use_watchdog: 是否使用文件系统事件代替定时扫描
             - log_level: 日志级别
             
     Note:
@@ -687,6 +1114,8 @@ def load_config() -> Dict[str, Any]:
         'scan_paths': scan_paths,
         'output_dir': os.getenv('OUTPUT_DIR', './converted_images'),
         'scan_interval': int(os.getenv('SCAN_INTERVAL', '5')),
+        'max_workers': int(os.getenv('MAX_WORKERS', str(os.cpu_count() or 4))),
+        'use_watchdog': os.getenv('USE_WATCHDOG', 'false').lower() in ('1', 'true', 'yes'),
         'log_level': os.getenv('LOG_LEVEL', 'INFO'),
     }
     
@@ -747,6 +1176,7 @@ def main() -> None:
     # 添加批量处理功能的参数
     parser.add_argument('--batch-process', metavar='FOLDER_PATH', help='批量处理指定文件夹中的所有图片文件，计算hash去重后插入数据库')
     parser.add_argument('--no-recursive', action='store_true', help='批量处理时不递归处理子文件夹（默认递归处理）')
+    parser.add_argument('--progress', action='store_true', help='批量处理前先统计文件总数，显示完成进度（需额外遍历一次目录）')
     
     args = parser.parse_args()
     
@@ -788,7 +1218,8 @@ def main() -> None:
             print("==================\n")
             
             # 执行批量处理
-            result = app.batch_process_folder(args.batch_process, recursive=recursive)
+            result = app.batch_process_folder(args.batch_process, recursive=recursive,
+                                              show_progress=args.progress)
             
             # 打印最终结果
             print(f"\n=== 批量处理结果 ===")
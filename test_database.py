@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+DatabaseManager 的单元测试（SQLite，无需 PostgreSQL）
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import delete
+
+from database import DatabaseManager, FileRecord, HashBloomFilter
+
+# 基线版本 create_all 在 SQLite 上生成的表结构
+BASELINE_SCHEMA = """
+CREATE TABLE file_records (
+    id INTEGER NOT NULL,
+    hash VARCHAR(128) NOT NULL,
+    original_name VARCHAR(500) NOT NULL,
+    file_size BIGINT NOT NULL,
+    extension VARCHAR(50) NOT NULL,
+    created_at DATETIME NOT NULL,
+    processed_at DATETIME NOT NULL,
+    source_path TEXT NOT NULL,
+    target_path TEXT,
+    hash_type VARCHAR(20) NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_file_hash UNIQUE (hash),
+    UNIQUE (hash)
+);
+CREATE INDEX idx_file_records_hash ON file_records (hash);
+CREATE INDEX idx_file_records_file_size ON file_records (file_size);
+CREATE INDEX idx_file_records_extension ON file_records (extension);
+CREATE INDEX idx_file_records_processed_at ON file_records (processed_at);
+"""
+
+
+def make_record(name: str, content: bytes) -> dict:
+    return {
+        'hash': hashlib.sha256(content).hexdigest(),
+        'original_name': name,
+        'source_path': f'/input/{name}',
+        'file_size': len(content),
+        'extension': '.png',
+        'created_at': datetime(2024, 1, 1),
+    }
+
+
+class LegacySQLiteUpgradeTest(unittest.TestCase):
+    """基线版本创建的 SQLite 数据库升级后仍可写入"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.db_path = Path(self._tmp.name) / 'legacy.db'
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(BASELINE_SCHEMA)
+        legacy = make_record('legacy.png', b'legacy')
+        conn.execute(
+            "INSERT INTO file_records (hash, original_name, file_size, extension, created_at, "
+            "processed_at, source_path, hash_type) VALUES (?, ?, ?, ?, ?, ?, ?, 'sha256')",
+            (legacy['hash'], legacy['original_name'], legacy['file_size'], legacy['extension'],
+             '2024-01-01 00:00:00', '2024-01-01 00:00:00', legacy['source_path'])
+        )
+        conn.commit()
+        conn.close()
+
+        self.db = DatabaseManager(f'sqlite:///{self.db_path}', hash_type='sha256')
+        self.addCleanup(self.db.close)
+        self.db.create_tables()
+
+    def test_insert_after_upgrade(self):
+        results = self.db.add_file_records_or_get_duplicates([
+            make_record('new.png', b'new'),
+            make_record('copy.png', b'legacy'),
+        ])
+        self.assertEqual(results, [None, 'legacy.png'])
+
+        inserted = self.db.add_file_records_bulk([make_record('bulk.png', b'bulk')])
+        self.assertEqual(inserted, 1)
+
+        conn = sqlite3.connect(self.db_path)
+        self.addCleanup(conn.close)
+        rows = conn.execute(
+            "SELECT original_name, processed_at IS NOT NULL, typeof(hash) FROM file_records ORDER BY id"
+        ).fetchall()
+        self.assertEqual(rows, [
+            ('legacy.png', 1, 'blob'),
+            ('new.png', 1, 'blob'),
+            ('bulk.png', 1, 'blob'),
+        ])
+
+    def test_upgrade_replaces_legacy_indexes(self):
+        conn = sqlite3.connect(self.db_path)
+        self.addCleanup(conn.close)
+        indexes = {name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+        self.assertIn('idx_fr_size_hash', indexes)
+        self.assertNotIn('idx_file_records_hash', indexes)
+        self.assertNotIn('idx_file_records_file_size', indexes)
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """每个测试使用一个新建的临时 SQLite 数据库"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.db_path = Path(self._tmp.name) / 'records.db'
+        self.db = self.open_database()
+
+    def open_database(self) -> DatabaseManager:
+        db = DatabaseManager(f'sqlite:///{self.db_path}', hash_type='sha256')
+        self.addCleanup(db.close)
+        db.create_tables()
+        return db
+
+    def query(self, sql: str) -> list:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+
+class HexDigestTest(SQLiteTestCase):
+    """哈希以原始字节存储，读写接口仍使用十六进制字符串"""
+
+    def test_hash_stored_as_digest_bytes(self):
+        record = make_record('a.png', b'a')
+        self.assertEqual(self.db.add_file_records_bulk([record]), 1)
+
+        self.assertEqual(self.query("SELECT typeof(hash), length(hash) FROM file_records"),
+                         [('blob', 32)])
+        self.assertEqual(self.db.check_duplicates_bulk([record['hash']]),
+                         {record['hash']: 'a.png'})
+        self.assertIsNone(self.db.check_duplicate(make_record('b.png', b'b')['hash']))
+
+    def test_migrate_legacy_hex_hashes(self):
+        self.db.add_file_records_bulk([make_record('kept.png', b'kept')])
+        self.db.close()
+
+        # 旧版本写入的十六进制文本哈希，其中一条与升级后写入的记录重复
+        conn = sqlite3.connect(self.db_path)
+        for record in (make_record('old.png', b'old'), make_record('stale.png', b'kept')):
+            conn.execute(
+                "INSERT INTO file_records (hash, original_name, file_size, extension, created_at, "
+                "source_path, hash_type) VALUES (?, ?, ?, ?, '2024-01-01 00:00:00', ?, 'sha256')",
+                (record['hash'], record['original_name'], record['file_size'],
+                 record['extension'], record['source_path'])
+            )
+        conn.commit()
+        conn.close()
+
+        db = self.open_database()
+        self.assertEqual(self.query("SELECT original_name, typeof(hash) FROM file_records ORDER BY id"),
+                         [('kept.png', 'blob'), ('old.png', 'blob')])
+        old_hash = make_record('old.png', b'old')['hash']
+        self.assertEqual(db.check_duplicates_bulk([old_hash]), {old_hash: 'old.png'})
+
+
+class BulkCopyTest(SQLiteTestCase):
+    """非 psycopg2 驱动时 bulk_copy_file_records 回退到批量插入"""
+
+    def test_fallback_skips_known_hashes(self):
+        self.db.add_file_records_bulk([make_record('a.png', b'a')])
+        inserted = self.db.bulk_copy_file_records([
+            make_record('a_copy.png', b'a'),
+            make_record('b.png', b'b'),
+        ])
+        self.assertEqual(inserted, 1)
+        self.assertEqual(self.query("SELECT original_name FROM file_records ORDER BY id"),
+                         [('a.png',), ('b.png',)])
+
+
+@unittest.skipUnless(os.getenv('TEST_POSTGRES_URL'), "设置 TEST_POSTGRES_URL 后运行 PostgreSQL COPY 测试")
+class PostgresCopyTest(unittest.TestCase):
+    """COPY 导入经临时表合并，已存在的哈希被跳过"""
+
+    def setUp(self):
+        self.db = DatabaseManager(os.environ['TEST_POSTGRES_URL'], hash_type=None)
+        self.addCleanup(self.db.close)
+        self.db.create_tables()
+        # 随机内容避免与库中已有记录冲突，测试结束后删除
+        self.records = [make_record(f'copy_{i}.png', os.urandom(16)) for i in range(3)]
+        self.addCleanup(self._delete_records)
+
+    def _delete_records(self):
+        with self.db.get_session() as session:
+            session.execute(delete(FileRecord).where(
+                FileRecord.hash.in_([record['hash'] for record in self.records])))
+
+    def test_copy_skips_known_hashes(self):
+        first, second, third = self.records
+        self.assertEqual(self.db.bulk_copy_file_records([first, second]), 2)
+        with self.db.batch_session() as session:
+            self.assertEqual(self.db.bulk_copy_file_records([second, third], session=session), 1)
+        self.assertEqual(
+            self.db.check_duplicates_bulk([record['hash'] for record in self.records]),
+            {record['hash']: record['original_name'] for record in self.records}
+        )
+
+
+class HashFilterTest(SQLiteTestCase):
+    """Bloom 过滤器不漏报，记录过多时不构建"""
+
+    def test_bloom_filter_membership(self):
+        hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(2000)]
+        bloom = HashBloomFilter(1000)
+        for file_hash in hashes[:1000]:
+            bloom.add(file_hash)
+
+        self.assertTrue(all(file_hash in bloom for file_hash in hashes[:1000]))
+        # 误判率 0.1%，1000 个未加入的哈希预期约 1 个误判
+        self.assertLess(sum(file_hash in bloom for file_hash in hashes[1000:]), 10)
+
+    def test_build_hash_filter(self):
+        records = [make_record(f'{i}.png', bytes([i])) for i in range(3)]
+        self.db.add_file_records_bulk(records)
+
+        hash_filter = self.db.build_hash_filter()
+        self.assertTrue(all(record['hash'] in hash_filter for record in records))
+        self.assertNotIn(make_record('new.png', b'new')['hash'], hash_filter)
+
+        self.assertIsNone(self.db.build_hash_filter(max_rows=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
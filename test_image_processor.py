@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+ImageProcessor 批量快速检查的单元测试
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from image_processor import ImageProcessor
+
+
+class ScanTest(unittest.TestCase):
+    """scan 按文件头识别格式与尺寸，单个损坏文件不影响整批"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.tmp_dir = Path(self._tmp.name)
+        self.processor = ImageProcessor()
+
+        # 签名和 IHDR 块类型完整，但宽高字段被截断（共18字节）
+        self.truncated = self.tmp_dir / 'truncated.png'
+        self.truncated.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00\x00\x00\x0dIHDR' + b'\x00\x00')
+
+        self.complete = self.tmp_dir / 'complete.png'
+        Image.new('RGB', (40, 30)).save(self.complete)
+
+        self.not_image = self.tmp_dir / 'not_image.png'
+        self.not_image.write_bytes(b'plain text, not an image')
+
+    def test_scan_truncated_png(self):
+        results = list(self.processor.scan([self.truncated, self.complete]))
+        self.assertEqual(len(results), 2)
+
+        truncated, complete = results
+        self.assertEqual(truncated['file_size'], 18)
+        self.assertEqual(truncated['format'], 'PNG')
+        self.assertIsNone(truncated['width'])
+        self.assertIsNone(truncated['height'])
+
+        self.assertEqual((complete['width'], complete['height']), (40, 30))
+        self.assertTrue(complete['is_valid'])
+
+    def test_scan_unrecognized_header(self):
+        result, = self.processor.scan([self.not_image])
+        self.assertFalse(result['is_valid'])
+        self.assertIsNone(result['format'])
+
+    def test_batch_validate_matches_scan(self):
+        paths = [self.truncated, self.complete, self.not_image]
+        # 截断的 PNG 签名仍可识别，按文件头检查视为有效；无法识别的文件头无效
+        self.assertEqual(self.processor.batch_validate(paths), [True, True, False])
+        self.assertEqual(self.processor.batch_validate(paths),
+                         [result['is_valid'] for result in self.processor.scan(paths)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,9 +19,14 @@ logger = logging.getLogger(__name__)
 
 def calculate_file_hash(file_path: Path) -> str:
     """Calculate SHA-256 hash of a file."""
-    hash_sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+    with open(file_path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: read/update loop runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        hash_sha256 = hashlib.sha256()
+        chunk_size = max(1 << 20, getattr(os.fstat(f.fileno()), "st_blksize", 0) * 16)
+        for chunk in iter(lambda: f.read(chunk_size), b""):
             hash_sha256.update(chunk)
     return hash_sha256.hexdigest()
 
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ImageDuplicateDetector 数据库写入线程的单元测试（SQLite，无需 PostgreSQL）
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+import database
+from database import DatabaseManager
+from main import ImageDuplicateDetector
+
+
+class WriterThreadTest(unittest.TestCase):
+    """记录由写入线程批量入库，随后删除重复文件、移动新文件"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        tmp_dir = Path(self._tmp.name)
+        self.scan_dir = tmp_dir / 'scan'
+        self.scan_dir.mkdir()
+        self.output_dir = tmp_dir / 'output'
+        self.db_path = tmp_dir / 'records.db'
+
+        database._db_manager = DatabaseManager(f'sqlite:///{self.db_path}', hash_type='sha256')
+        self.addCleanup(self._reset_database)
+
+        self.app = ImageDuplicateDetector({
+            'scan_paths': [str(self.scan_dir)],
+            'output_dir': str(self.output_dir),
+            'scan_interval': 1,
+        })
+        self.assertTrue(self.app.initialize())
+        self.addCleanup(self.app._stop_writer)
+
+    @staticmethod
+    def _reset_database():
+        database.close_database()
+        database._db_manager = None
+
+    def make_image(self, name: str, color: tuple, size: tuple = (8, 8)) -> Path:
+        path = self.scan_dir / name
+        Image.new('RGB', size, color).save(path)
+        return path
+
+    def stored_rows(self) -> list:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT original_name, hex(hash) FROM file_records ORDER BY id").fetchall()
+        finally:
+            conn.close()
+
+    def stat_values(self) -> dict:
+        return {key: int(self.app.stats[key]) for key in ('processed', 'duplicates', 'errors')}
+
+    def test_store_new_and_delete_duplicate(self):
+        first = self.make_image('a.png', (255, 0, 0))
+        self.make_image('b.png', (0, 0, 255))
+        shutil.copy(first, self.scan_dir / 'a_copy.png')
+
+        for path in sorted(self.scan_dir.iterdir()):
+            self.app._process_file(path, os.stat(path))
+        self.app.flush_pending_records()
+
+        self.assertEqual(self.stat_values(), {'processed': 2, 'duplicates': 1, 'errors': 0})
+        self.assertEqual([name for name, _ in self.stored_rows()], ['a.png', 'b.png'])
+        self.assertEqual(sorted(p.name for p in self.output_dir.iterdir()), ['a.png', 'b.png'])
+        self.assertEqual(list(self.scan_dir.iterdir()), [])
+
+    def test_coalesce_records_for_same_file(self):
+        path = self.make_image('c.png', (0, 255, 0))
+        older = os.stat(path)
+        older_hash = database.get_db_manager().calculate_file_hash(path)
+
+        # 原地重写（同一 inode），并确保修改时间晚于第一次 stat
+        Image.new('RGB', (16, 16), (0, 255, 0)).save(path)
+        os.utime(path, ns=(older.st_atime_ns, older.st_mtime_ns + 1_000_000_000))
+        newer = os.stat(path)
+        self.assertEqual((older.st_dev, older.st_ino), (newer.st_dev, newer.st_ino))
+        newer_hash = database.get_db_manager().calculate_file_hash(path)
+
+        # 哈希线程乱序完成：较新的记录先入队
+        self.app._queue_record(path, newer, newer_hash)
+        self.app._queue_record(path, older, older_hash)
+        self.app.flush_pending_records()
+
+        self.assertEqual(self.stat_values(), {'processed': 1, 'duplicates': 0, 'errors': 0})
+        self.assertEqual(self.stored_rows(), [('c.png', newer_hash.upper())])
+
+    def test_drop_file_changed_after_hashing(self):
+        path = self.make_image('d.png', (0, 0, 0))
+        file_stat = os.stat(path)
+        self.app._queue_record(path, file_stat, database.get_db_manager().calculate_file_hash(path))
+        with open(path, 'ab') as f:
+            f.write(b'still writing')
+        self.app.flush_pending_records()
+
+        self.assertEqual(self.stat_values(), {'processed': 0, 'duplicates': 0, 'errors': 0})
+        self.assertEqual(self.stored_rows(), [])
+        self.assertTrue(path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()